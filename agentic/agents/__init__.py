@@ -1,6 +1,24 @@
-from .classifier import classifier_agent
-from .retriever import retriever_agent
-from .resolver import resolver_agent
-from .escalation import escalation_agent
+import importlib
 
-__all__ = ["classifier_agent", "retriever_agent", "resolver_agent", "escalation_agent"]
+# Agents are built on first access (PEP 562) so importing the package stays cheap
+# for workers that only need one of them.
+_AGENT_MODULES = {
+    "classifier_agent": "classifier",
+    "retriever_agent": "retriever",
+    "resolver_agent": "resolver",
+    "escalation_agent": "escalation",
+    "triage_agent": "triage",
+}
+
+__all__ = list(_AGENT_MODULES)
+
+
+def __getattr__(name):
+    module = _AGENT_MODULES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(f".{module}", __name__), name)
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
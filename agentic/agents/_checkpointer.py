@@ -0,0 +1,79 @@
+
+import asyncio
+import logging
+import os
+import sqlite3
+from typing import Any, AsyncIterator, Optional, Sequence
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import ChannelVersions, Checkpoint, CheckpointMetadata, CheckpointTuple
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+logger = logging.getLogger(__name__)
+
+
+class ThreadedSqliteSaver(SqliteSaver):
+    """
+    ``SqliteSaver`` that also serves the async checkpoint API from worker threads.
+
+    The graphs run through ``ainvoke``, which needs the async methods the sync saver
+    leaves unimplemented. ``AsyncSqliteSaver`` binds itself to the event loop it was
+    created on, but the app opens a new loop per ``asyncio.run`` call, so the sync
+    implementation (already thread-safe behind its lock) is reused instead.
+    """
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        items = await asyncio.to_thread(
+            lambda: list(self.list(config, filter=filter, before=before, limit=limit))
+        )
+        for item in items:
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+
+def sqlite_checkpointer(db_path: str) -> ThreadedSqliteSaver:
+    """
+    Open the process-wide checkpointer on ``db_path`` (WAL, synchronous=NORMAL).
+
+    Checkpoints survive restarts, so a resumed thread continues from its last step
+    instead of replaying the conversation.
+    """
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+
+    logger.info("Using SQLite checkpoints at %s", db_path)
+    return ThreadedSqliteSaver(conn)
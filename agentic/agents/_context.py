@@ -0,0 +1,101 @@
+
+import asyncio
+import json
+import logging
+from typing import Optional, Sequence
+
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage, ToolMessage
+from langchain_core.runnables import RunnableConfig
+
+from agentic.tools.cultpass_tools import get_user_general_info
+from agentic.tools.ticket_tools import get_customer_ticket_history, get_ticket_info, get_user_preferences
+
+logger = logging.getLogger(__name__)
+
+HISTORY_WINDOW = 20
+
+
+async def prefetch_context(state: dict, config: RunnableConfig) -> dict:
+    """
+    Graph-entry node: load the ticket once so the LLM sees it without a get_ticket_info round-trip.
+
+    The ticket id is taken from the state, then ``configurable.ticket_id``, then the
+    ``thread_id`` (the demo scenarios use the ticket id as the thread id). The graph
+    state must declare ``ticket_id`` and ``ticket_context`` keys.
+    """
+    configurable = config.get("configurable", {})
+    ticket_id = state.get("ticket_id") or configurable.get("ticket_id") or configurable.get("thread_id")
+
+    if not ticket_id:
+        logger.debug("No ticket id available; running from the conversation only.")
+        return {}
+
+    info = await asyncio.to_thread(get_ticket_info, ticket_id)
+    if "error" in info:
+        logger.debug("No ticket context for %s: %s", ticket_id, info["error"])
+        return {}
+
+    return {"ticket_id": ticket_id, "ticket_context": json.dumps(info, default=str)}
+
+
+async def prefetch_user_context(state: dict, config: RunnableConfig) -> dict:
+    """
+    Graph node: load the customer's ticket history, stored preferences and CultPass profile concurrently.
+
+    Runs after ``prefetch_context`` and keys off the ticket's ``external_user_id``. The
+    graph state must declare a ``user_context`` key.
+    """
+    ticket_context = state.get("ticket_context")
+    user_id = json.loads(ticket_context).get("external_user_id") if ticket_context else None
+
+    if not user_id:
+        logger.debug("No external_user_id available; skipping user context.")
+        return {}
+
+    history, preferences, profile = await asyncio.gather(
+        asyncio.to_thread(get_customer_ticket_history, user_id),
+        asyncio.to_thread(get_user_preferences, user_id),
+        asyncio.to_thread(get_user_general_info, user_id),
+    )
+
+    user_context = {"history": history, "preferences": preferences, "profile": profile}
+    return {"user_context": json.dumps(user_context, default=str)}
+
+
+def trim_history(messages: Sequence[BaseMessage], keep: int = HISTORY_WINDOW) -> Sequence[BaseMessage]:
+    """
+    Keep the last ``keep`` messages without orphaning tool results.
+
+    If the window would start on a ToolMessage, it is widened back to the AIMessage that
+    issued the call. The first customer message is always kept so the original issue
+    stays in view.
+    """
+    if len(messages) <= keep:
+        return messages
+
+    start = len(messages) - keep
+    while start > 0 and isinstance(messages[start], ToolMessage):
+        start -= 1
+
+    window = list(messages[start:])
+    first_human = next((m for m in messages[:start] if isinstance(m, HumanMessage)), None)
+    if first_human is not None:
+        window.insert(0, first_human)
+
+    logger.debug("Trimmed conversation from %d to %d messages.", len(messages), len(window))
+    return window
+
+
+def with_context(system_msg: SystemMessage, state: dict) -> tuple:
+    """Build the model input: static prompt, optional TICKET / USER CONTEXT blocks, then the trimmed conversation."""
+    blocks = [system_msg]
+
+    ticket_context: Optional[str] = state.get("ticket_context")
+    if ticket_context:
+        blocks.append(SystemMessage(content=f"TICKET CONTEXT:\n{ticket_context}"))
+
+    user_context: Optional[str] = state.get("user_context")
+    if user_context:
+        blocks.append(SystemMessage(content=f"USER CONTEXT:\n{user_context}"))
+
+    return (*blocks, *trim_history(state["messages"]))
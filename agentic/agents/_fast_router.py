@@ -0,0 +1,141 @@
+
+import json
+import logging
+import re
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from settings import settings
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+
+FAST_CONFIDENCE = 0.9
+MIN_KEYWORD_HITS = 2
+
+# Whole-message greetings, acknowledgements and bare ticket ids carry nothing to search for.
+_TRIVIAL_PATTERN = re.compile(
+    r"^(?:(?:hi|hello|hey|thanks|thank you|thx|ok|okay|bye|goodbye|yes|no|cool|great)(?:\s+there)?"
+    r"|[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})[\s!.,?]*$",
+    re.IGNORECASE,
+)
+
+EMPTY_RETRIEVAL = {"confidence": 0.0, "articles_found": 0, "retrieved_articles": []}
+
+# ---------------------------------------------------------------------------
+# Keyword index (built once at import)
+# ---------------------------------------------------------------------------
+
+def _load_articles(path: str) -> List[Dict]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+    except (OSError, json.JSONDecodeError) as exc:
+        logger.warning("Fast router disabled; could not load KB articles from %s: %s", path, exc)
+        return []
+
+
+def _keyword_pattern(keyword: str) -> str:
+    # "qr-code" also matches "qr code" / "qrcode"; a trailing "s" covers simple plurals.
+    parts = [re.escape(p) for p in re.split(r"[-\s]+", keyword)]
+    return r"[-\s]?".join(parts) + "s?"
+
+
+_articles = _load_articles(settings.knowledge_json_path)
+
+# keyword -> indices of the articles tagged with it
+_keyword_articles: Dict[str, List[int]] = defaultdict(list)
+for _idx, _article in enumerate(_articles):
+    for _tag in (_article.get("tags") or "").split(","):
+        _tag = _tag.strip().lower()
+        if _tag:
+            _keyword_articles[_tag].append(_idx)
+
+# One alternation, longest keywords first so "payment-history" wins over "payment".
+_keywords = sorted(_keyword_articles, key=len, reverse=True)
+_pattern: Optional[re.Pattern] = (
+    re.compile(
+        r"\b(?:" + "|".join(f"(?P<k{i}>{_keyword_pattern(k)})" for i, k in enumerate(_keywords)) + r")\b",
+        re.IGNORECASE,
+    )
+    if _keywords
+    else None
+)
+
+
+def _keyword_hits(text: str) -> Dict[int, set]:
+    """Article index -> distinct tag keywords of that article found in ``text``."""
+    hits: Dict[int, set] = defaultdict(set)
+    if _pattern is None or not text:
+        return hits
+
+    for match in _pattern.finditer(text):
+        keyword = _keywords[int(match.lastgroup[1:])]
+        for idx in _keyword_articles[keyword]:
+            hits[idx].add(keyword)
+    return hits
+
+# ---------------------------------------------------------------------------
+# Public API
+# ---------------------------------------------------------------------------
+
+def is_trivial(text: str) -> bool:
+    """True if ``text`` is only a greeting, acknowledgement or ticket id."""
+    return bool(_TRIVIAL_PATTERN.match(text.strip()))
+
+
+def match_article(text: str) -> Optional[dict]:
+    """
+    Map a customer message straight to a KB article when the keywords are unambiguous.
+
+    An article matches when at least ``MIN_KEYWORD_HITS`` distinct tag keywords occur
+    in ``text`` and no other article has as many hits.
+
+    Returns:
+        A retrieval dict in the same shape as the retriever's validated output
+        (confidence, articles_found, retrieved_articles), or None to fall through to the LLM.
+    """
+    hits = _keyword_hits(text)
+    if not hits:
+        return None
+
+    ranked = sorted(hits.items(), key=lambda item: len(item[1]), reverse=True)
+    best_idx, best_keywords = ranked[0]
+    if len(best_keywords) < MIN_KEYWORD_HITS:
+        return None
+    if len(ranked) > 1 and len(ranked[1][1]) == len(best_keywords):
+        return None
+
+    article = _articles[best_idx]
+    logger.info("Fast router matched '%s' on keywords %s", article["title"], sorted(best_keywords))
+    return {
+        "confidence": FAST_CONFIDENCE,
+        "articles_found": 1,
+        "retrieved_articles": [
+            {
+                "title": article["title"],
+                "summary": article["content"],
+                "relevance": f"Matched keywords: {', '.join(sorted(best_keywords))}.",
+            }
+        ],
+    }
+
+
+def expansion_queries(text: str, limit: int = 3) -> List[str]:
+    """
+    Keyword search queries built from the KB tags found in ``text``.
+
+    One query per matching article (its matched tags joined), best-covered article
+    first. Cheap enough to run on every search, unlike an LLM rephrasing turn.
+    """
+    queries: List[str] = []
+    for keywords in sorted(_keyword_hits(text).values(), key=len, reverse=True):
+        query = " ".join(sorted(keywords))
+        if query not in queries:
+            queries.append(query)
+        if len(queries) == limit:
+            break
+    return queries
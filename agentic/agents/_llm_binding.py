@@ -0,0 +1,90 @@
+import hashlib
+import json
+import logging
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Callable
+
+from langchain_core.runnables import RunnableLambda
+
+logger = logging.getLogger(__name__)
+
+
+def per_llm_cache(maxsize: int = 8) -> Callable:
+    """
+    LRU cache for functions of a single chat model, keyed by ``id(llm)``.
+
+    Chat models are pydantic objects and therefore unhashable, so ``functools.lru_cache``
+    cannot key on them directly. The model is stored alongside the cached value so its id
+    cannot be recycled by another object while the entry is alive.
+
+    A weak-keyed cache would not help here: every cached value is a binding that holds
+    the model strongly, so the key could never be collected. The LRU bound is what
+    releases models that are no longer used.
+    """
+    def decorator(fn: Callable[[Any], Any]) -> Callable[[Any], Any]:
+        cache: "OrderedDict[int, tuple]" = OrderedDict()
+
+        @wraps(fn)
+        def wrapper(llm: Any) -> Any:
+            key = id(llm)
+            entry = cache.get(key)
+            if entry is not None and entry[0] is llm:
+                cache.move_to_end(key)
+                return entry[1]
+
+            logger.debug("Building %s for llm id=%d", fn.__name__, key)
+            value = fn(llm)
+            cache[key] = (llm, value)
+            if len(cache) > maxsize:
+                cache.popitem(last=False)
+            return value
+
+        wrapper.cache_clear = cache.clear
+        return wrapper
+
+    return decorator
+
+
+def prompt_cache_key(name: str, prompt: str) -> str:
+    """
+    Stable ``prompt_cache_key`` for a static system prompt.
+
+    OpenAI caches prompt prefixes automatically; sending the same key with every request
+    that shares a prefix routes them to the same cache. The key includes a hash of the
+    prompt, so editing the prompt starts a fresh cache entry.
+    """
+    digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:12]
+    logger.info("System prompt %s has hash %s", name, digest)
+    return f"{name}-{digest}"
+
+
+def with_prompt_cache_key(llm: Any, key: str) -> Any:
+    """
+    Copy of a chat model that sends ``prompt_cache_key=key`` with every request.
+
+    For models handed to code that calls ``bind_tools`` itself (e.g. ``create_supervisor``),
+    where a ``.bind(prompt_cache_key=...)`` wrapper would be dropped. The copy shares the
+    original's HTTP clients.
+    """
+    return llm.model_copy(update={"model_kwargs": {**llm.model_kwargs, "prompt_cache_key": key}})
+
+
+def parse_json_output(validate: Callable[[dict], dict]) -> RunnableLambda:
+    """
+    Runnable that parses a JSON-mode AIMessage and passes the object through ``validate``.
+
+    Raises:
+        ValueError: If the content is not a JSON object or fails validation.
+    """
+    def _parse(message: Any) -> dict:
+        try:
+            data = json.loads(message.content)
+        except (TypeError, json.JSONDecodeError) as exc:
+            raise ValueError(f"LLM did not return valid JSON: {exc}") from exc
+
+        if not isinstance(data, dict):
+            raise ValueError(f"Expected a JSON object, got {type(data).__name__}")
+        return validate(data)
+
+    return RunnableLambda(_parse)
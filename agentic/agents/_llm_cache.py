@@ -0,0 +1,161 @@
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Optional, Sequence
+
+import numpy as np
+from cachetools import TLRUCache
+from langchain_core.messages import BaseMessage, HumanMessage
+
+from agentic.agents._semantic_cache import embed_text
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+
+CACHE_MAXSIZE = 2048
+SEMANTIC_INDEX_MAXSIZE = 512
+SEMANTIC_THRESHOLD = 0.92
+
+# ---------------------------------------------------------------------------
+# Backends
+# ---------------------------------------------------------------------------
+
+# Values are (payload, ttl) tuples so each entry can carry its own time-to-live.
+_cache = TLRUCache(maxsize=CACHE_MAXSIZE, ttu=lambda _key, value, now: now + value[1])
+_lock = threading.Lock()
+
+
+class _SemanticIndex:
+    """Bounded list of unit-normalised query embeddings pointing at exact-cache keys."""
+
+    def __init__(self, maxsize: int):
+        self._maxsize = maxsize
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def add(self, key: str, namespace: str, vector: np.ndarray) -> None:
+        self._entries[key] = (namespace, vector)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def nearest(self, namespace: str, vector: np.ndarray) -> tuple:
+        candidates = [(k, v) for k, (ns, v) in self._entries.items() if ns == namespace]
+        if not candidates:
+            return None, 0.0
+
+        keys, vectors = zip(*candidates)
+        scores = np.stack(vectors) @ vector
+        best = int(np.argmax(scores))
+        return keys[best], float(scores[best])
+
+
+_semantic_index = _SemanticIndex(SEMANTIC_INDEX_MAXSIZE)
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _model_name(llm: Any) -> str:
+    return getattr(llm, "model_name", None) or getattr(llm, "model", None) or type(llm).__name__
+
+
+def _cache_key(namespace: str, messages: Sequence[BaseMessage]) -> str:
+    # Message and tool-call ids are unique per run, so only role, content and
+    # tool-call name/args take part in the key.
+    payload = json.dumps(
+        [
+            [
+                msg.type,
+                msg.content,
+                [[tc["name"], tc["args"]] for tc in getattr(msg, "tool_calls", None) or []],
+            ]
+            for msg in messages
+        ],
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256((namespace + payload).encode("utf-8")).hexdigest()
+
+
+def _last_human_text(messages: Sequence[BaseMessage]) -> Optional[str]:
+    for msg in reversed(messages):
+        if isinstance(msg, HumanMessage) and isinstance(msg.content, str):
+            return msg.content
+    return None
+
+# ---------------------------------------------------------------------------
+# Public API
+# ---------------------------------------------------------------------------
+
+async def cached_structured_ainvoke(
+    llm: Any,
+    messages: Sequence[BaseMessage],
+    schema: str,
+    runnable: Any,
+    ttl: float = 3600,
+    *,
+    semantic: bool = True,
+) -> dict:
+    """
+    Invoke a structured-output runnable, serving repeated requests from cache.
+
+    Exact matches are keyed on the model name, the schema name and the full message
+    list. When ``semantic`` is set, a miss falls back to a cosine lookup of the last
+    human message against recently cached queries (threshold ``SEMANTIC_THRESHOLD``).
+
+    Args:
+        llm: The chat model; used for the cache namespace.
+        messages: The full message list sent to the model.
+        schema: Name of the output schema, e.g. "ClassificationOutput".
+        runnable: Runnable called on a miss; must return a validated, JSON-compatible dict.
+        ttl: Seconds a cached result stays valid.
+        semantic: Whether to try the near-duplicate lookup on an exact miss.
+
+    Returns:
+        The validated output dict, either cached or freshly generated. Treat it as read-only.
+    """
+    namespace = f"{_model_name(llm)}:{schema}"
+    key = _cache_key(namespace, messages)
+
+    with _lock:
+        entry = _cache.get(key)
+    if entry is not None:
+        logger.debug("LLM cache exact hit for %s.", namespace)
+        return entry[0]
+
+    vector = None
+    query = _last_human_text(messages) if semantic else None
+    if query:
+        vector = await embed_text(query)
+
+    if vector is not None:
+        with _lock:
+            near_key, score = _semantic_index.nearest(namespace, vector)
+            entry = _cache.get(near_key) if near_key and score >= SEMANTIC_THRESHOLD else None
+        if entry is not None:
+            logger.debug("LLM cache semantic hit for %s (score=%.3f).", namespace, score)
+            return entry[0]
+
+    result = await runnable.ainvoke(messages)
+
+    with _lock:
+        _cache[key] = (result, ttl)
+        if vector is not None:
+            _semantic_index.add(key, namespace, vector)
+
+    return result
+
+
+def clear_cache() -> None:
+    """Drop every cached response and semantic index entry."""
+    with _lock:
+        _cache.clear()
+        _semantic_index.clear()
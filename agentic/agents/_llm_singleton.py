@@ -0,0 +1,122 @@
+
+import asyncio
+import logging
+import os
+import threading
+import weakref
+from typing import TYPE_CHECKING, Any, Callable, Optional
+
+import httpx
+from langchain_core.runnables import RunnableConfig
+
+if TYPE_CHECKING:
+    from langchain_openai import ChatOpenAI
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+
+DEFAULT_MODEL = "gpt-4o-mini"
+BASE_URL = "https://openai.vocareum.com/v1"
+HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=100, keepalive_expiry=60)
+HTTP_TIMEOUT = httpx.Timeout(60.0, connect=5.0)
+# Well inside keepalive_expiry, so an idle pooled connection is never dropped.
+KEEPALIVE_INTERVAL = 30.0
+
+_default_llm: Optional["ChatOpenAI"] = None
+_lock = threading.Lock()
+
+
+class LoopLocalTransport(httpx.AsyncBaseTransport):
+    """
+    Async transport that keeps a separate connection pool for each event loop.
+
+    Pooled connections belong to the loop that opened them, but the app runs several
+    loops over its lifetime (``asyncio.run`` for the scenarios, then again for the chat,
+    or once per turn in ``utils.chat_interface``). Reusing a connection from a closed
+    loop fails with "Event loop is closed", so each loop gets its own pool. Pools are
+    held weakly and go away with their loop.
+    """
+
+    def __init__(self, factory: Callable[[], httpx.AsyncBaseTransport]):
+        self._factory = factory
+        self._pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncBaseTransport]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._pools_lock = threading.Lock()
+
+    def _pool(self) -> httpx.AsyncBaseTransport:
+        loop = asyncio.get_running_loop()
+        with self._pools_lock:
+            pool = self._pools.get(loop)
+            if pool is None:
+                pool = self._pools[loop] = self._factory()
+            return pool
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self._pool().handle_async_request(request)
+
+    async def aclose(self) -> None:
+        # Only the running loop's pool can be closed from here; the others close with their loops.
+        loop = asyncio.get_running_loop()
+        with self._pools_lock:
+            pool = self._pools.pop(loop, None)
+        if pool is not None:
+            await pool.aclose()
+
+
+def get_default_llm() -> "ChatOpenAI":
+    """
+    Return the process-wide ChatOpenAI, built on first use.
+
+    It shares one ``httpx.AsyncClient`` so every ticket reuses warm keep-alive
+    connections instead of paying DNS + TCP + TLS setup per request. The connections
+    are pooled per event loop (see ``LoopLocalTransport``).
+    """
+    global _default_llm
+
+    if _default_llm is None:
+        from langchain_openai import ChatOpenAI
+
+        with _lock:
+            if _default_llm is None:
+                logger.debug("Creating default ChatOpenAI with a pooled HTTP client.")
+                _default_llm = ChatOpenAI(
+                    model=DEFAULT_MODEL,
+                    base_url=BASE_URL,
+                    api_key=os.getenv("VOCAREUM_OPENAPI_KEY"),
+                    temperature=0,
+                    http_async_client=httpx.AsyncClient(
+                        transport=LoopLocalTransport(lambda: httpx.AsyncHTTPTransport(limits=HTTP_LIMITS)),
+                        timeout=HTTP_TIMEOUT,
+                    ),
+                )
+    return _default_llm
+
+
+def resolve_llm(config: RunnableConfig) -> Any:
+    """Return ``configurable.llm`` if set, otherwise the shared default model."""
+    llm = config.get("configurable", {}).get("llm")
+    if llm is None:
+        logger.debug("No 'llm' found in configurable; using the shared default ChatOpenAI.")
+        return get_default_llm()
+    return llm
+
+
+async def keep_warm(interval: float = KEEPALIVE_INTERVAL) -> None:
+    """
+    Ping ``BASE_URL`` on the shared client every ``interval`` seconds until cancelled.
+
+    Meant to run as a background task while the app is idle (e.g. waiting for the user
+    to type), so the next model call finds an open connection instead of a new TLS handshake.
+    """
+    client = get_default_llm().http_async_client
+    while True:
+        try:
+            await client.head(BASE_URL)
+        except Exception as exc:
+            # A failed ping must not end the task; the next model call reconnects anyway.
+            logger.debug("Keep-alive ping failed: %s", exc)
+        await asyncio.sleep(interval)
@@ -0,0 +1,120 @@
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+import numpy as np
+from cachetools import LRUCache
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+
+EMBEDDING_MODEL = "text-embedding-3-small"
+EMBEDDING_CACHE_MAXSIZE = 1024
+
+# ---------------------------------------------------------------------------
+# Embeddings
+# ---------------------------------------------------------------------------
+
+_embeddings = None
+_vectors: LRUCache = LRUCache(maxsize=EMBEDDING_CACHE_MAXSIZE)
+_vectors_lock = threading.Lock()
+
+
+async def embed_text(text: str) -> Optional[np.ndarray]:
+    """
+    Embed ``text`` as a unit vector, or return None if embeddings are unavailable.
+
+    Vectors are memoised by exact text, so a lookup followed by a store for the same
+    query costs a single embedding request.
+    """
+    global _embeddings
+
+    with _vectors_lock:
+        vector = _vectors.get(text)
+    if vector is not None:
+        return vector
+
+    try:
+        if _embeddings is None:
+            from langchain_openai import OpenAIEmbeddings
+
+            _embeddings = OpenAIEmbeddings(
+                model=EMBEDDING_MODEL,
+                base_url="https://openai.vocareum.com/v1",
+                api_key=os.getenv("VOCAREUM_OPENAPI_KEY"),
+            )
+        raw = np.asarray(await _embeddings.aembed_query(text), dtype=np.float32)
+    except Exception as exc:
+        logger.debug("Embedding unavailable: %s", exc)
+        return None
+
+    norm = np.linalg.norm(raw)
+    if not norm:
+        return None
+
+    vector = raw / norm
+    with _vectors_lock:
+        _vectors[text] = vector
+    return vector
+
+# ---------------------------------------------------------------------------
+# Cache
+# ---------------------------------------------------------------------------
+
+class SemanticCache:
+    """
+    Bounded, expiring map from unit-normalised query embeddings to results.
+
+    ``get`` returns the value stored for the most similar vector in the same namespace
+    when its cosine similarity reaches the threshold. Entries expire after their own
+    ``ttl`` and the least recently used entry is evicted beyond ``maxsize``.
+    """
+
+    def __init__(self, maxsize: int = 512, threshold: float = 0.9):
+        self.maxsize = maxsize
+        self.threshold = threshold
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def get(self, namespace: str, vector: np.ndarray, threshold: Optional[float] = None) -> Optional[Any]:
+        tau = self.threshold if threshold is None else threshold
+        now = time.monotonic()
+
+        with self._lock:
+            expired = [k for k, (_, _, _, expires) in self._entries.items() if expires <= now]
+            for k in expired:
+                del self._entries[k]
+
+            candidates = [(k, v) for k, (ns, v, _, _) in self._entries.items() if ns == namespace]
+            if not candidates:
+                return None
+
+            keys, vectors = zip(*candidates)
+            scores = np.stack(vectors) @ vector
+            best = int(np.argmax(scores))
+            if scores[best] < tau:
+                return None
+
+            key = keys[best]
+            self._entries.move_to_end(key)
+            logger.debug("Semantic cache hit in %s (score=%.3f).", namespace, scores[best])
+            return self._entries[key][2]
+
+    def put(self, namespace: str, vector: np.ndarray, value: Any, ttl: float = 300) -> None:
+        with self._lock:
+            self._entries[self._next_id] = (namespace, vector, value, time.monotonic() + ttl)
+            self._next_id += 1
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
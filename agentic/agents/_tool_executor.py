@@ -0,0 +1,61 @@
+
+import asyncio
+import inspect
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Dict, Iterable, Mapping, Union
+
+from langchain_core.messages import ToolMessage
+
+logger = logging.getLogger(__name__)
+
+# One pool for every agent's tool calls; the tools are short, I/O-bound DB and search calls.
+SHARED_EXECUTOR = ThreadPoolExecutor(max_workers=32, thread_name_prefix="agent-tool")
+
+
+async def run_tool(tools_by_name: Dict[str, Callable], name: str, args: dict, tool_call_id: str) -> ToolMessage:
+    """Run one tool and wrap the result (or error) as a ToolMessage.
+
+    Coroutine tools are awaited on the event loop; plain functions run on the shared pool.
+    """
+    tool = tools_by_name.get(name)
+    if tool is None:
+        return ToolMessage(content=f"Error: unknown tool {name!r}.", name=name, tool_call_id=tool_call_id, status="error")
+
+    try:
+        if inspect.iscoroutinefunction(tool):
+            result = await tool(**args)
+        else:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(SHARED_EXECUTOR, partial(tool, **args))
+    except Exception as exc:
+        logger.exception("Tool %s failed: %s", name, exc)
+        return ToolMessage(content=f"Error: {exc!r}", name=name, tool_call_id=tool_call_id, status="error")
+
+    return ToolMessage(content=json.dumps(result, default=str), name=name, tool_call_id=tool_call_id)
+
+
+class ParallelToolNode:
+    """
+    Graph node that runs every tool call of the last AIMessage concurrently.
+
+    Replaces ``ToolNode`` for the plain-function tools used here: all calls of a turn
+    are gathered on ``SHARED_EXECUTOR``, so wall time is the slowest call rather
+    than the sum. ``tools`` may also be a mapping from tool name to implementation,
+    e.g. to serve a tool's schema name with its async variant.
+    """
+
+    def __init__(self, tools: Union[Iterable[Callable], Mapping[str, Callable]]):
+        if isinstance(tools, Mapping):
+            self.tools_by_name = dict(tools)
+        else:
+            self.tools_by_name = {tool.__name__: tool for tool in tools}
+
+    async def __call__(self, state: dict) -> dict:
+        tool_calls = getattr(state["messages"][-1], "tool_calls", None) or []
+        messages = await asyncio.gather(
+            *(run_tool(self.tools_by_name, c["name"], c["args"], c["id"]) for c in tool_calls)
+        )
+        return {"messages": list(messages)}
@@ -1,7 +1,10 @@
 
 
+import asyncio
+import json
 import logging
-from typing import Annotated, Literal, Optional
+from dataclasses import dataclass
+from typing import Annotated, Literal, Optional, get_args
 
 from langchain_core.messages import SystemMessage
 from langgraph.graph import StateGraph, END
@@ -9,9 +12,12 @@ from langgraph.graph.message import add_messages
 from pydantic import BaseModel, Field
 from typing_extensions import TypedDict
 from langchain_core.runnables import RunnableConfig
-from langgraph.prebuilt import ToolNode, tools_condition
 
-from agentic.tools.ticket_tools import get_ticket_info, update_ticket_status
+from agentic.agents._context import prefetch_context, with_context
+from agentic.agents._llm_binding import parse_json_output, per_llm_cache
+from agentic.agents._llm_cache import cached_structured_ainvoke
+from agentic.agents._llm_singleton import resolve_llm
+from agentic.tools.ticket_tools import update_ticket_status
 
 logger = logging.getLogger(__name__)
 
@@ -20,7 +26,12 @@ logger = logging.getLogger(__name__)
 # ---------------------------------------------------------------------------
 
 class ClassificationOutput(BaseModel):
-   """Structured classification produced by the agent."""
+   """
+   Schema of the classification produced by the agent.
+
+   Used to describe the expected JSON in the prompt; responses are checked by the
+   lightweight ``_validate_classification`` rather than by pydantic.
+   """
 
    issue_type: Literal[
       "login", "billing", "reservation", "subscription", "account", "general"
@@ -42,22 +53,32 @@ class ClassificationOutput(BaseModel):
    )
 
 
+@dataclass(slots=True, frozen=True)
+class Classification:
+   """Validated classification as stored in graph state."""
+   issue_type: str
+   urgency: str
+   sentiment: str
+   summary: str
+
+
 class ClassifierState(TypedDict):
    """Full state carried through the classifier graph."""
    messages: Annotated[list, add_messages]
-   classification: Optional[ClassificationOutput]
+   classification: Optional[Classification]
+   ticket_id: Optional[str]
+   ticket_context: Optional[str]
 
 # ---------------------------------------------------------------------------
 # Shared resources
 # ---------------------------------------------------------------------------
 
-CLASSIFIER_TOOLS = [get_ticket_info, update_ticket_status]
-
 CLASSIFIER_SYSTEM_PROMPT = """
 You are the **Classifier Agent** for UDA-Hub, an intelligent customer-support platform.
 
 Your job:
-1. Receive the current conversation context (the customer's message and ticket info).
+1. Receive the current conversation context (the customer's message and, when
+   available, a TICKET CONTEXT block with the ticket details).
 2. Determine the **issue_type** from one of:
    - login        : problems signing in, password reset, 2FA issues
    - billing      : payment failures, refund requests, invoices
@@ -73,43 +94,70 @@ Your job:
 
 4. Detect **sentiment** (frustrated / negative / neutral / positive).
 
-5. Use the `update_ticket_status` tool to persist:
-   - status     : 'in_progress'
-   - issue_type : as classified above
-   - tags       : comma-separated tags including urgency and sentiment
-
-6. Return a concise classification summary so the Supervisor can route correctly.
+5. Return a concise classification summary so the Supervisor can route correctly.
    Format: "CLASSIFIED: issue_type=<type>, urgency=<urgency>, sentiment=<sentiment>"
 
 Do NOT attempt to resolve the issue — that is the Resolver Agent's job.
-Always call `update_ticket_status` to save your classification.
+Your classification is saved to the ticket automatically.
+
+"""
 
+_OUTPUT_FORMAT = f"""
+### Output
+Respond with a single JSON object with exactly these fields (JSON schema):
+{json.dumps(ClassificationOutput.model_json_schema()["properties"], indent=2)}
 """
 
+_SYSTEM_MSG = SystemMessage(content=CLASSIFIER_SYSTEM_PROMPT + _OUTPUT_FORMAT)
+
+_FIELDS = ClassificationOutput.model_fields
+ISSUE_TYPES = frozenset(get_args(_FIELDS["issue_type"].annotation))
+URGENCIES = frozenset(get_args(_FIELDS["urgency"].annotation))
+SENTIMENTS = frozenset(get_args(_FIELDS["sentiment"].annotation))
+
+
+def _validate_classification(data: dict) -> dict:
+   """Check the JSON classification against the allowed values and drop unknown keys."""
+   for field, allowed in (("issue_type", ISSUE_TYPES), ("urgency", URGENCIES), ("sentiment", SENTIMENTS)):
+      if data.get(field) not in allowed:
+         raise ValueError(f"Invalid {field}: {data.get(field)!r}")
+
+   if not isinstance(data.get("summary"), str):
+      raise ValueError(f"Invalid summary: {data.get('summary')!r}")
+
+   return {
+      "issue_type": data["issue_type"],
+      "urgency": data["urgency"],
+      "sentiment": data["sentiment"],
+      "summary": data["summary"],
+   }
+
+
+@per_llm_cache(maxsize=8)
+def _bind(llm):
+   """Put ``llm`` in JSON mode and attach the classification validator."""
+   return llm.bind(response_format={"type": "json_object"}) | parse_json_output(_validate_classification)
+
 # ---------------------------------------------------------------------------
 # Node functions
 # ---------------------------------------------------------------------------
 
-def extract_classification(state: ClassifierState, config: RunnableConfig) -> dict:
+async def extract_classification(state: ClassifierState, config: RunnableConfig) -> dict:
    """
-   Run a structured-output pass to populate ClassifierState.classification.
+   Run a structured-output pass to populate ClassifierState.classification and
+   persist the result to the ticket directly (no tool round-trip).
    """
    logger.debug("extract_classification node invoked. message count=%d", len(state["messages"]))
 
-   llm = config.get("configurable", {}).get("llm", None)
+   llm = resolve_llm(config)
 
-   if llm is None:
-      logger.warning("No 'llm' found in configurable; falling back to default ChatOpenAI.")
-      return {}
+   messages = with_context(_SYSTEM_MSG, state)
 
-   llm_with_tools = llm.bind_tools(CLASSIFIER_TOOLS)
-   messages = [SystemMessage(content=CLASSIFIER_SYSTEM_PROMPT)] + state["messages"]
-
-   logger.debug("Invoking structured-output LLM with %d tools.", len(CLASSIFIER_TOOLS))
-   llm_with_structured = llm_with_tools.with_structured_output(ClassificationOutput)
+   llm_with_structured = _bind(llm)
 
    try:
-      result: ClassificationOutput = llm_with_structured.invoke(messages)
+      data = await cached_structured_ainvoke(llm, messages, "ClassificationOutput", llm_with_structured)
+      result = Classification(**data)
    except Exception as exc:
       logger.exception("Structured-output LLM call failed: %s", exc)
       raise
@@ -120,6 +168,19 @@ def extract_classification(state: ClassifierState, config: RunnableConfig) -> di
       result.urgency,
       result.sentiment,
    )
+
+   ticket_id = state.get("ticket_id")
+   if ticket_id:
+      update = await asyncio.to_thread(
+         update_ticket_status,
+         ticket_id,
+         status="in_progress",
+         issue_type=result.issue_type,
+         tags=f"{result.urgency}, {result.sentiment}",
+      )
+      if "error" in update:
+         logger.warning("Could not persist classification for %s: %s", ticket_id, update["error"])
+
    return {"classification": result}
 
 # ---------------------------------------------------------------------------
@@ -127,16 +188,12 @@ def extract_classification(state: ClassifierState, config: RunnableConfig) -> di
 # ---------------------------------------------------------------------------
 
 builder = StateGraph(ClassifierState)
+builder.add_node("prefetch_context", prefetch_context)
 builder.add_node("extract_classification", extract_classification)
-builder.add_node("tools", ToolNode(CLASSIFIER_TOOLS))
-
-builder.set_entry_point("extract_classification")
-builder.add_conditional_edges(
-    "extract_classification",
-    tools_condition
-)
 
-builder.add_edge("tools", "extract_classification")
+builder.set_entry_point("prefetch_context")
+builder.add_edge("prefetch_context", "extract_classification")
+builder.add_edge("extract_classification", END)
 
 classifier_agent = builder.compile()
 classifier_agent.name = "classifier"
@@ -1,33 +1,43 @@
 
+import asyncio
+import json
 import logging
-from typing import Annotated
+from typing import Annotated, Dict, Optional
 
-from langchain_core.messages import SystemMessage
+from langchain_core.messages import AIMessageChunk, SystemMessage, ToolMessage, message_chunk_to_message
 from langchain_core.runnables import RunnableConfig
 from langgraph.graph import StateGraph, END
-from langgraph.graph.message import add_messages, MessagesState
-from langgraph.prebuilt import ToolNode, tools_condition
+from langgraph.graph.message import add_messages
 from typing_extensions import TypedDict
 
-from agentic.tools.ticket_tools import (
-    get_ticket_info,
-    update_ticket_status,
-    add_ticket_message,
-)
+from agentic.agents._context import prefetch_context, with_context
+from agentic.agents._llm_binding import per_llm_cache
+from agentic.agents._llm_singleton import resolve_llm
+from agentic.agents._tool_executor import run_tool
+from agentic.tools._schemas import tool_schemas
+from agentic.tools.ticket_tools import finalize_ticket
 from agentic.tools.cultpass_tools import get_user_general_info
 
 logger = logging.getLogger(__name__)
 
+# ---------------------------------------------------------------------------
+# State schema
+# ---------------------------------------------------------------------------
+
+class EscalationState(TypedDict):
+    """Full state carried through the escalation graph."""
+    messages: Annotated[list, add_messages]
+    ticket_id: Optional[str]
+    ticket_context: Optional[str]
+
 # ---------------------------------------------------------------------------
 # Shared resources
 # ---------------------------------------------------------------------------
 
-ESCALATION_TOOLS = [
-    get_ticket_info,
-    update_ticket_status,
-    add_ticket_message,
+ESCALATION_TOOLS = (
+    finalize_ticket,
     get_user_general_info,
-]
+)
 
 ESCALATION_SYSTEM_PROMPT = """
 You are the **Escalation Agent** for UDA-Hub.
@@ -36,7 +46,7 @@ You are called when a ticket cannot be resolved automatically and requires human
 
 Your responsibilities:
 
-1. **Retrieve ticket details** with `get_ticket_info` to review the full context.
+1. **Review ticket details** in the TICKET CONTEXT block (already loaded for you) when available.
 
 2. **Retrieve user profile** with `get_user_general_info` if an external_user_id is
    available, to check for blocked status, subscription tier, or billing anomalies.
@@ -48,55 +58,119 @@ Your responsibilities:
    - Recommended action (e.g. manual refund review, account unblock, billing correction)
    - Urgency level
 
-4. **Append the escalation note** to the ticket via `add_ticket_message` with role='system'.
-
-5. **Write a customer-facing closing message** that:
+4. **Write a customer-facing closing message** that:
    - Acknowledges their frustration / issue
    - Confirms a human agent will follow up within 24 hours (standard) or 4 hours (high urgency)
    - Provides a reference (the ticket_id)
 
-6. **Persist** via `add_ticket_message` with role='ai' for the customer-facing response
-   and `update_ticket_status` with status='escalated'.
+5. **Persist everything in ONE call** to `finalize_ticket` with status='escalated',
+   message=<customer-facing message>, message_role='ai', and note=<escalation note>.
+   Do not split this into several tool calls.
 
 Always be empathetic. The customer should feel heard and confident help is coming.
 """
 
+_SYSTEM_MSG = SystemMessage(content=ESCALATION_SYSTEM_PROMPT)
+
+
+@per_llm_cache(maxsize=8)
+def _bind(llm):
+    """Bind the precomputed escalation tool schemas to ``llm`` once per model."""
+    return llm.bind(tools=tool_schemas(ESCALATION_TOOLS))
+
+
+_TOOLS_BY_NAME = {tool.__name__: tool for tool in ESCALATION_TOOLS}
+
+
+def _dispatch_complete(chunk_calls: list, dispatched: Dict[str, asyncio.Task], streaming: bool) -> None:
+    """
+    Start a task for every fully streamed tool call not yet dispatched.
+
+    Tool calls stream one after another, so while streaming every call except the
+    last one seen is complete.
+    """
+    complete = chunk_calls[:-1] if streaming else chunk_calls
+    for call in complete:
+        call_id = call.get("id")
+        if not call_id or call_id in dispatched:
+            continue
+        try:
+            args = json.loads(call.get("args") or "{}")
+        except json.JSONDecodeError:
+            continue  # left to the final parse, which reports it as an invalid call
+        dispatched[call_id] = asyncio.create_task(run_tool(_TOOLS_BY_NAME, call["name"], args, call_id))
+
 # ---------------------------------------------------------------------------
 # Node functions
 # ---------------------------------------------------------------------------
 
-def llm_call(state: MessagesState, config: RunnableConfig) -> dict:
-    """Invoke the LLM (with tools bound) and append its response."""
-    logger.debug("llm_call node invoked. message count=%d", len(state["messages"]))
+async def llm_call(state: EscalationState, config: RunnableConfig) -> dict:
+    """
+    Stream the LLM response and run its tool calls in-node.
 
-    llm = config.get("configurable", {}).get("llm", None)
+    Each tool call is dispatched as soon as it has finished streaming, so the profile
+    lookup (get_user_general_info) and the single finalize_ticket write of note, reply
+    and status overlap with the rest of the decode. The AIMessage and its ToolMessages
+    are returned together.
+    """
+    logger.debug("llm_call node invoked. message count=%d", len(state["messages"]))
 
-    if llm is None:
-        logger.warning("No 'llm' found in configurable; falling back to default ChatOpenAI.")
-        return {}
+    llm = resolve_llm(config)
 
-    llm_with_tools = llm.bind_tools(ESCALATION_TOOLS)
-    messages = [SystemMessage(content=ESCALATION_SYSTEM_PROMPT)] + state["messages"]
+    llm_with_tools = _bind(llm)
+    messages = with_context(_SYSTEM_MSG, state)
 
+    dispatched: Dict[str, asyncio.Task] = {}
+    full = None
     try:
-        response = llm_with_tools.invoke(messages)
+        async for chunk in llm_with_tools.astream(messages):
+            full = chunk if full is None else full + chunk
+            if isinstance(full, AIMessageChunk) and full.tool_call_chunks:
+                _dispatch_complete(full.tool_call_chunks, dispatched, streaming=True)
     except Exception as exc:
         logger.exception("LLM call failed: %s", exc)
+        for task in dispatched.values():
+            task.cancel()
         raise
 
-    return {"messages": [response]}
+    response = message_chunk_to_message(full) if isinstance(full, AIMessageChunk) else full
+
+    for call in getattr(response, "tool_calls", None) or []:
+        if call["id"] not in dispatched:
+            dispatched[call["id"]] = asyncio.create_task(run_tool(_TOOLS_BY_NAME, call["name"], call["args"], call["id"]))
+
+    tool_messages = list(await asyncio.gather(*dispatched.values()))
+    tool_messages += [
+        ToolMessage(
+            content=f"Error: invalid arguments for {call['name']}: {call['args']}",
+            name=call["name"],
+            tool_call_id=call["id"],
+            status="error",
+        )
+        for call in getattr(response, "invalid_tool_calls", None) or []
+        if call["id"] and call["id"] not in dispatched
+    ]
+    logger.info("Escalation step complete. tool_calls=%d", len(tool_messages))
+    return {"messages": [response, *tool_messages]}
+
+
+def _should_continue(state: EscalationState) -> str:
+    """Loop back to the LLM after tool results, otherwise finish."""
+    if isinstance(state["messages"][-1], ToolMessage):
+        return "llm_call"
+    return END
 
 # ---------------------------------------------------------------------------
 # Graph assembly
 # ---------------------------------------------------------------------------
 
-builder = StateGraph(MessagesState)
+builder = StateGraph(EscalationState)
+builder.add_node("prefetch_context", prefetch_context)
 builder.add_node("llm_call", llm_call)
-builder.add_node("tools", ToolNode(ESCALATION_TOOLS))
 
-builder.set_entry_point("llm_call")
-builder.add_conditional_edges("llm_call", tools_condition)
-builder.add_edge("tools", "llm_call")
+builder.set_entry_point("prefetch_context")
+builder.add_edge("prefetch_context", "llm_call")
+builder.add_conditional_edges("llm_call", _should_continue, ["llm_call", END])
 
 escalation_agent = builder.compile()
 escalation_agent.name = "escalation"
@@ -1,25 +1,24 @@
 
 import logging
-from typing import Annotated
+from typing import Annotated, Optional
 
-from langchain_openai import ChatOpenAI
 from langchain_core.messages import SystemMessage
 from langchain_core.runnables import RunnableConfig
 from langgraph.graph import StateGraph, END
 from langgraph.graph.message import add_messages
-from langgraph.prebuilt import ToolNode
 from typing_extensions import TypedDict
 
+from agentic.agents._context import prefetch_context, prefetch_user_context, with_context
+from agentic.agents._llm_binding import per_llm_cache
+from agentic.agents._llm_singleton import resolve_llm
+from agentic.agents._tool_executor import ParallelToolNode
+from agentic.tools._schemas import tool_schemas
 from agentic.tools.ticket_tools import (
-   get_ticket_info,
    update_ticket_status,
-   add_ticket_message,
-   get_customer_ticket_history,
-   get_user_preferences,
+   finalize_ticket,
    update_user_preferences,
 )
 from agentic.tools.cultpass_tools import (
-   get_user_general_info,
    get_user_reservations,
    get_experience_availability,
 )
@@ -33,22 +32,21 @@ logger = logging.getLogger(__name__)
 class ResolverState(TypedDict):
     """Full state carried through the resolver graph."""
     messages: Annotated[list, add_messages]
+    ticket_id: Optional[str]
+    ticket_context: Optional[str]
+    user_context: Optional[str]
 
 # ---------------------------------------------------------------------------
 # Shared resources
 # ---------------------------------------------------------------------------
 
-RESOLVER_TOOLS = [
-   get_ticket_info,
+RESOLVER_TOOLS = (
    update_ticket_status,
-   add_ticket_message,
-   get_customer_ticket_history,
-   get_user_preferences,
+   finalize_ticket,
    update_user_preferences,
-   get_user_general_info,
    get_user_reservations,
    get_experience_availability,
-]
+)
 
 RESOLVER_SYSTEM_PROMPT = """
 You are the **Resolver Agent** for UDA-Hub.
@@ -56,27 +54,28 @@ You are the **Resolver Agent** for UDA-Hub.
 Your goal is to RESOLVE customer support tickets by following these steps:
 
 1. **Understand the issue**: Read the conversation context carefully, including the
-   articles already retrieved and shared by the Retriever Agent.
+   articles already retrieved and shared by the Retriever Agent and, when available,
+   the TICKET CONTEXT block with the ticket details (already loaded for you).
 
 2a. **Use the retrieved knowledge base articles**: The Retriever Agent has already
    searched the knowledge base and shared the relevant articles in the conversation context.
    Use those articles as your primary source of policy and procedure information.
 
-2b. **Check interaction history** (if an external_user_id is available):
-   - Call `get_customer_ticket_history` to see if this is a returning customer.
+2b. **Check interaction history** (if a USER CONTEXT block is available):
+   - Consult its `history` to see if this is a returning customer.
    - If they have prior tickets for the same issue_type, acknowledge it and avoid
      asking them to repeat information already captured (e.g. "I can see you
      contacted us about this before — let me look into what's changed").
 
-2c. **Retrieve and apply customer preferences** (if an external_user_id is available):
-   - Call `get_user_preferences` to check stored language, preferred channel, and notes.
+2c. **Apply customer preferences** (if a USER CONTEXT block is available):
+   - Consult its `preferences` for stored language, preferred channel, and notes.
    - Apply the preferred language when composing your reply.
    - If you discover new preference information during this interaction (e.g. the
      customer mentions they prefer email updates or speaks French), call
      `update_user_preferences` to persist it for future sessions.
 
-3. **Fetch account context when needed**:
-   - Use `get_user_general_info` to check if the user's account is blocked or has an
+3. **Use account context**:
+   - Consult the USER CONTEXT `profile` to check if the user's account is blocked or has an
      active subscription before advising on subscription-related issues.
    - Use `get_user_reservations` for reservation queries.
    - Use `get_experience_availability` when the user asks about specific events.
@@ -87,9 +86,9 @@ Your goal is to RESOLVE customer support tickets by following these steps:
    - Provide concrete next steps.
    - If the account is blocked, inform the user and explain they need to contact support.
 
-5. **Save and finalise**:
-   - Call `add_ticket_message` with role='agent' to persist your answer.
-   - If resolved: call `update_ticket_status` with status='resolved'.
+5. **Save and finalise** in ONE call:
+   - Call `finalize_ticket` with status='resolved' and message=<your answer> to persist
+     your answer and close the ticket together.
 
 ### Escalation rules — when you CANNOT resolve automatically
 
@@ -111,25 +110,31 @@ Always be concise, accurate, and helpful. Never make up policy information — o
 what you find in the knowledge base.
 """
 
+_SYSTEM_MSG = SystemMessage(content=RESOLVER_SYSTEM_PROMPT)
+
+NEEDS_ESC_MARKER = "NEEDS_ESCALATION"
+
+
+@per_llm_cache(maxsize=8)
+def _bind(llm):
+   """Bind the precomputed resolver tool schemas to ``llm`` once per model."""
+   return llm.bind(tools=tool_schemas(RESOLVER_TOOLS))
+
 # ---------------------------------------------------------------------------
 # Node functions
 # ---------------------------------------------------------------------------
 
-def llm_call(state: ResolverState, config: RunnableConfig) -> dict:
+async def llm_call(state: ResolverState, config: RunnableConfig) -> dict:
    """Invoke the LLM (with tools bound) and append its response."""
    logger.debug("llm_call node invoked. message count=%d", len(state["messages"]))
 
-   llm = config.get("configurable", {}).get("llm", None)
-
-   if llm is None:
-      logger.warning("No 'llm' found in configurable; falling back to default ChatOpenAI.")
-      return {}
+   llm = resolve_llm(config)
 
-   llm_with_tools = llm.bind_tools(RESOLVER_TOOLS)
-   messages = [SystemMessage(content=RESOLVER_SYSTEM_PROMPT)] + state["messages"]
+   llm_with_tools = _bind(llm)
+   messages = with_context(_SYSTEM_MSG, state)
 
    try:
-      response = llm_with_tools.invoke(messages)
+      response = await llm_with_tools.ainvoke(messages)
    except Exception as exc:
       logger.exception("LLM call failed: %s", exc)
       raise
@@ -148,8 +153,10 @@ def _should_continue(state: ResolverState) -> str:
 
     # If the LLM signalled escalation, stop immediately so the supervisor
     # can read the NEEDS_ESCALATION content and route to the escalation agent.
-    content = getattr(last_msg, "content", "") or ""
-    if "NEEDS_ESCALATION" in content:
+    # The prompt requires the token to be the whole message, so an exact match
+    # avoids false positives from longer replies that merely mention it.
+    content = getattr(last_msg, "content", None)
+    if isinstance(content, str) and content.strip() == NEEDS_ESC_MARKER:
         logger.info("NEEDS_ESCALATION detected — ending resolver graph.")
         return END
 
@@ -165,10 +172,14 @@ def _should_continue(state: ResolverState) -> str:
 # ---------------------------------------------------------------------------
 
 builder = StateGraph(ResolverState)
+builder.add_node("prefetch_context", prefetch_context)
+builder.add_node("prefetch_user_context", prefetch_user_context)
 builder.add_node("llm_call", llm_call)
-builder.add_node("tools", ToolNode(RESOLVER_TOOLS))
+builder.add_node("tools", ParallelToolNode(RESOLVER_TOOLS))
 
-builder.set_entry_point("llm_call")
+builder.set_entry_point("prefetch_context")
+builder.add_edge("prefetch_context", "prefetch_user_context")
+builder.add_edge("prefetch_user_context", "llm_call")
 builder.add_conditional_edges("llm_call", _should_continue, ["tools", END])
 builder.add_edge("tools", "llm_call")
 
@@ -1,16 +1,29 @@
 
+import hashlib
+import json
 import logging
+import threading
+from dataclasses import dataclass
 from typing import Annotated, List, Optional
 
-from langchain_core.messages import SystemMessage, AIMessage
+from cachetools import TTLCache
+from langchain_core.messages import SystemMessage, AIMessage, HumanMessage, ToolMessage
 from langchain_core.runnables import RunnableConfig
+from langchain_core.utils.function_calling import convert_to_openai_tool
 from langgraph.graph import StateGraph, END
 from langgraph.graph.message import add_messages
-from langgraph.prebuilt import ToolNode, tools_condition
 from pydantic import BaseModel, Field
 from typing_extensions import TypedDict
 
-from agentic.tools.knowledge_tools import search_knowledge_base
+from agentic.agents._context import trim_history
+from agentic.agents._fast_router import EMPTY_RETRIEVAL, expansion_queries, is_trivial, match_article
+from agentic.agents._llm_binding import parse_json_output, per_llm_cache, prompt_cache_key
+from agentic.agents._llm_cache import cached_structured_ainvoke
+from agentic.agents._llm_singleton import resolve_llm
+from agentic.agents._semantic_cache import SemanticCache, embed_text
+from agentic.agents._tool_executor import ParallelToolNode
+from agentic.tools._schemas import tool_schemas
+from agentic.tools.knowledge_tools import abatch_search_knowledge_base, batch_search_knowledge_base
 
 logger = logging.getLogger(__name__)
 
@@ -29,7 +42,12 @@ class RetrievedArticle(BaseModel):
 
 
 class RetrieverOutput(BaseModel):
-    """Structured retrieval result produced by the agent."""
+    """
+    Schema of the retrieval assessment produced by the agent.
+
+    Used to describe the ``submit_retrieval`` arguments and the extraction JSON;
+    responses are checked by the lightweight ``_validate_retrieval`` rather than by pydantic.
+    """
 
     confidence: float = Field(
         ge=0.0,
@@ -50,17 +68,32 @@ class RetrieverOutput(BaseModel):
     )
 
 
+@dataclass(slots=True, frozen=True)
+class Article:
+    """Validated retrieved article as stored in graph state."""
+    title: str
+    summary: str
+    relevance: str
+
+
 class RetrieverState(TypedDict):
     """Full state carried through the retriever graph."""
     messages: Annotated[list, add_messages]
     confidence: Optional[float]
-    retrieved_articles: Optional[List[RetrievedArticle]]
+    retrieved_articles: Optional[List[Article]]
 
 # ---------------------------------------------------------------------------
 # Shared resources
 # ---------------------------------------------------------------------------
 
-RETRIEVER_TOOLS = [search_knowledge_base]
+RETRIEVER_TOOLS = (batch_search_knowledge_base,)
+
+# Schemas come from the sync tools above; the tools node runs their async variants.
+_ASYNC_TOOLS = {batch_search_knowledge_base.__name__: abatch_search_knowledge_base}
+_search_tools = ParallelToolNode(_ASYNC_TOOLS)
+
+# Cap on queries in one batch after adding keyword variants to the LLM's own phrasings.
+MAX_BATCH_QUERIES = 5
 
 RETRIEVER_SEARCH_PROMPT = """
 You are Retriever Agent for UDA-Hub.
@@ -73,9 +106,9 @@ to resolve the customer's issue.
 
 1. **Identify the query**: Extract the core topic from the conversation.
 
-2. **Search the knowledge base**: Call `search_knowledge_base` with the
-   most relevant keywords. You may call it a second time with rephrased
-   keywords if the first results do not seem relevant.
+2. **Search the knowledge base**: Emit a single `batch_search_knowledge_base`
+   call with 2-3 rephrased queries (e.g. the customer's wording plus keyword
+   variants). The searches run concurrently, so do not search one query at a time.
 
 3. **Read and judge the articles**: Carefully read each returned article's
    title, content, and tags. Ask yourself:
@@ -90,11 +123,16 @@ to resolve the customer's issue.
    - 0.4 – 0.59: Content is only tangentially related; unlikely to resolve alone.
    - 0.0 – 0.39: No article meaningfully addresses the issue; escalation needed.
 
+5. **Submit**: Call `submit_retrieval` once with the confidence, the number of
+   relevant articles, and for each relevant article its title, a brief summary,
+   and one sentence on why it is relevant.
+
 ### Rules
-- Call `search_knowledge_base` with relevant keywords extracted from the customer message.
-- You may call it a second time with rephrased keywords if first results are not relevant.
+- Call `batch_search_knowledge_base` once with 2-3 rephrased queries extracted from the customer message.
+- Only search again if none of the batched results are relevant.
+- Never call `submit_retrieval` in the same turn as a search.
 - Do NOT attempt to answer the customer's question.
-- Once you have searched, stop. Do not call any other tools.
+- Once you have submitted, stop. Do not call any other tools.
 """
 
 RETRIEVER_EXTRACT_PROMPT = """
@@ -115,24 +153,186 @@ retrieval assessment:
 Base your assessment on the actual search result content, not on guesses.
 """
 
+_SEARCH_SYSTEM_MSG = SystemMessage(content=RETRIEVER_SEARCH_PROMPT)
+_OUTPUT_FORMAT = f"""
+### Output
+Respond with a single JSON object matching this JSON schema:
+{json.dumps(RetrieverOutput.model_json_schema(), indent=2)}
+"""
+
+_EXTRACT_SYSTEM_MSG = SystemMessage(content=RETRIEVER_EXTRACT_PROMPT + _OUTPUT_FORMAT)
+
+# The system messages above are the only static prefix; ticket and conversation data
+# always follow them, so every turn can reuse the provider's cached prefix.
+_SEARCH_CACHE_KEY = prompt_cache_key("retriever-search", _SEARCH_SYSTEM_MSG.content)
+_EXTRACT_CACHE_KEY = prompt_cache_key("retriever-extract", _EXTRACT_SYSTEM_MSG.content)
+
+_ARTICLE_FIELDS = ("title", "summary", "relevance")
+
+# Terminal "tool": the model submits its assessment as tool-call arguments in the same
+# pass as the search loop, so no separate extraction call is needed.
+SUBMIT_TOOL = "submit_retrieval"
+_SUBMIT_SCHEMA = convert_to_openai_tool(RetrieverOutput)
+_SUBMIT_SCHEMA["function"].update(
+    name=SUBMIT_TOOL,
+    description="Submit the final retrieval assessment once the search results have been judged.",
+)
+
+
+def _validate_retrieval(data: dict) -> dict:
+    """Check the JSON retrieval assessment field by field and drop unknown keys."""
+    confidence = data.get("confidence")
+    if isinstance(confidence, bool) or not isinstance(confidence, (int, float)) or not 0.0 <= confidence <= 1.0:
+        raise ValueError(f"Invalid confidence: {confidence!r}")
+
+    articles_found = data.get("articles_found")
+    if isinstance(articles_found, bool) or not isinstance(articles_found, int):
+        raise ValueError(f"Invalid articles_found: {articles_found!r}")
+
+    articles = data.get("retrieved_articles", [])
+    if not isinstance(articles, list):
+        raise ValueError(f"Invalid retrieved_articles: {articles!r}")
+
+    checked = []
+    for article in articles:
+        if not isinstance(article, dict) or not all(isinstance(article.get(f), str) for f in _ARTICLE_FIELDS):
+            raise ValueError(f"Invalid article: {article!r}")
+        checked.append({f: article[f] for f in _ARTICLE_FIELDS})
+
+    return {
+        "confidence": float(confidence),
+        "articles_found": articles_found,
+        "retrieved_articles": checked,
+    }
+
+
+@per_llm_cache(maxsize=8)
+def _bind_search(llm):
+    """Bind the precomputed search and submit tool schemas to ``llm`` once per model."""
+    return llm.bind(tools=[*tool_schemas(RETRIEVER_TOOLS), _SUBMIT_SCHEMA], prompt_cache_key=_SEARCH_CACHE_KEY)
+
+
+@per_llm_cache(maxsize=8)
+def _bind_extract(llm):
+    """Put ``llm`` in JSON mode and attach the retrieval validator once per model."""
+    return (
+        llm.bind(response_format={"type": "json_object"}, prompt_cache_key=_EXTRACT_CACHE_KEY)
+        | parse_json_output(_validate_retrieval)
+    )
+
+# Extraction results keyed by a hash of the search results. The batch results embed
+# their queries, so identical tool output means the same searches returned the same articles.
+_extraction_cache = TTLCache(maxsize=10_000, ttl=86400)
+_extraction_lock = threading.Lock()
+
+
+# Whole retrieval results keyed by the embedding of the customer's query, so paraphrased
+# repeats skip the search and extraction calls. Kept short-lived because KB edits are not tracked.
+RETRIEVAL_CACHE_THRESHOLD = 0.9
+RETRIEVAL_CACHE_TTL = 300
+
+_retrieval_cache = SemanticCache(maxsize=1024, threshold=RETRIEVAL_CACHE_THRESHOLD)
+
+
+def _last_human_text(messages: list) -> Optional[str]:
+    last_human = next((m.content for m in reversed(messages) if isinstance(m, HumanMessage)), None)
+    return last_human if isinstance(last_human, str) else None
+
+
+def _retrieval_namespace(llm, config: RunnableConfig) -> str:
+    """Scope cached retrievals to the workspace and model that produced them."""
+    workspace = config.get("configurable", {}).get("workspace", "default")
+    model = getattr(llm, "model_name", None) or type(llm).__name__
+    return f"{workspace}:{model}"
+
+
+def _tool_results_key(messages: list) -> Optional[str]:
+    """Hash the content of every ToolMessage, or None if there are no tool results."""
+    digest = hashlib.sha256()
+    found = False
+    for msg in messages:
+        if isinstance(msg, ToolMessage):
+            digest.update(json.dumps(msg.content, sort_keys=True).encode("utf-8"))
+            found = True
+    return digest.hexdigest() if found else None
+
+
+async def _remember(state: RetrieverState, config: RunnableConfig, llm, result: dict) -> None:
+    """Store a fresh result in the extraction and semantic caches."""
+    tool_key = _tool_results_key(state["messages"])
+    if tool_key is not None:
+        with _extraction_lock:
+            _extraction_cache[tool_key] = result
+
+    query = _last_human_text(state["messages"])
+    vector = await embed_text(query) if query else None
+    if vector is not None:
+        _retrieval_cache.put(_retrieval_namespace(llm, config), vector, result, ttl=RETRIEVAL_CACHE_TTL)
+
+
+def _retrieval_update(result: dict) -> dict:
+    """Turn a validated retrieval dict into the RETRIEVAL_RESULT message and state update."""
+    logger.info(
+        "Retrieval complete — confidence=%.2f, articles_found=%d",
+        result["confidence"],
+        result["articles_found"],
+    )
+
+    retrieval_msg = AIMessage(
+        content=f"RETRIEVAL_RESULT: confidence={result['confidence']:.2f}, articles_found={result['articles_found']}"
+    )
+    return {
+        "messages": [retrieval_msg],
+        "confidence": result["confidence"],
+        "retrieved_articles": [Article(**a) for a in result["retrieved_articles"]],
+    }
+
 # ---------------------------------------------------------------------------
 # Node functions
 # ---------------------------------------------------------------------------
 
-def llm_call(state: RetrieverState, config: RunnableConfig) -> dict:
-    """ReAct node: binds search tools and lets the LLM call search_knowledge_base."""
-    logger.debug("llm_call node invoked. message count=%d", len(state["messages"]))
+def fast_route(state: RetrieverState) -> dict:
+    """Entry node: answer trivial messages and unambiguous keyword matches without any LLM call."""
+    last_human = _last_human_text(state["messages"])
+    if last_human and is_trivial(last_human):
+        logger.debug("Trivial message %r; skipping retrieval.", last_human)
+        return _retrieval_update(EMPTY_RETRIEVAL)
 
-    llm = config.get("configurable", {}).get("llm", None)
-    if llm is None:
-        logger.warning("No 'llm' found in configurable; skipping.")
+    result = match_article(last_human) if last_human else None
+    if result is None:
         return {}
+    return _retrieval_update(result)
 
-    llm_with_tools = llm.bind_tools(RETRIEVER_TOOLS)
-    messages = [SystemMessage(content=RETRIEVER_SEARCH_PROMPT)] + state["messages"]
+
+async def semantic_lookup(state: RetrieverState, config: RunnableConfig) -> dict:
+    """Reuse the retrieval for a near-duplicate of a recent customer query."""
+    query = _last_human_text(state["messages"])
+    vector = await embed_text(query) if query else None
+    if vector is None:
+        return {}
+
+    result = _retrieval_cache.get(_retrieval_namespace(resolve_llm(config), config), vector)
+    if result is None:
+        return {}
+    return _retrieval_update(result)
+
+
+def _after_lookup(state: RetrieverState) -> str:
+    """End if an earlier node produced a result, otherwise continue to the next stage."""
+    return END if state.get("confidence") is not None else "next"
+
+
+async def llm_call(state: RetrieverState, config: RunnableConfig) -> dict:
+    """ReAct node: the LLM searches with batch_search_knowledge_base, then calls submit_retrieval."""
+    logger.debug("llm_call node invoked. message count=%d", len(state["messages"]))
+
+    llm = resolve_llm(config)
+
+    llm_with_tools = _bind_search(llm)
+    messages = (_SEARCH_SYSTEM_MSG, *trim_history(state["messages"]))
 
     try:
-        response = llm_with_tools.invoke(messages)
+        response = await llm_with_tools.ainvoke(messages)
     except Exception as exc:
         logger.exception("LLM call failed: %s", exc)
         raise
@@ -140,47 +340,104 @@ def llm_call(state: RetrieverState, config: RunnableConfig) -> dict:
     return {"messages": [response]}
 
 
-def _should_continue(state: RetrieverState) -> str:
-    """Route to tools if there are pending tool calls, otherwise extract structured output."""
+def _with_expansions(message: AIMessage, extra: List[str]) -> AIMessage:
+    """Copy of ``message`` whose first batch search also carries the ``extra`` queries."""
+    calls = list(message.tool_calls)
+    for i, call in enumerate(calls):
+        if call["name"] != batch_search_knowledge_base.__name__:
+            continue
+        queries = list(call["args"].get("queries") or [])
+        seen = {q.lower() for q in queries}
+        for query in extra:
+            if len(queries) >= MAX_BATCH_QUERIES:
+                break
+            if query.lower() not in seen:
+                queries.append(query)
+                seen.add(query.lower())
+        calls[i] = {**call, "args": {**call["args"], "queries": queries}}
+        break
+    return message.model_copy(update={"tool_calls": calls})
+
+
+async def tools(state: RetrieverState) -> dict:
+    """Run the search calls concurrently, widening the first round with tag-keyword variants.
+
+    The extra queries run in the same batch as the LLM's own rephrasings, so a weak first
+    phrasing no longer costs a second search turn.
+    """
     last = state["messages"][-1]
-    if getattr(last, "tool_calls", None):
+    if not any(isinstance(m, ToolMessage) for m in state["messages"]):
+        query = _last_human_text(state["messages"])
+        extra = expansion_queries(query) if query else []
+        if extra:
+            logger.debug("Adding keyword variants to the first search: %s", extra)
+            last = _with_expansions(last, extra)
+    return await _search_tools({"messages": [last]})
+
+
+def _should_continue(state: RetrieverState) -> str:
+    """Route a submission to submit, other tool calls to tools; plain text falls back to extraction."""
+    tool_calls = getattr(state["messages"][-1], "tool_calls", None) or []
+    if tool_calls and all(c["name"] == SUBMIT_TOOL for c in tool_calls):
+        return "submit"
+    if tool_calls:
         return "tools"
     return "extract_retrieval"
 
 
-def extract_retrieval(state: RetrieverState, config: RunnableConfig) -> dict:
-    """Structured-output node: reads all messages (including tool results) and
-    produces a RetrieverOutput with confidence score and article list."""
+async def submit(state: RetrieverState, config: RunnableConfig) -> dict:
+    """Validate the submit_retrieval arguments; invalid ones are returned to the LLM as a tool error."""
+    tool_calls = state["messages"][-1].tool_calls
+
+    try:
+        result = _validate_retrieval(tool_calls[0]["args"])
+    except ValueError as exc:
+        logger.warning("Rejected %s arguments: %s", SUBMIT_TOOL, exc)
+        errors = [
+            ToolMessage(content=f"Error: {exc}", name=SUBMIT_TOOL, tool_call_id=c["id"], status="error")
+            for c in tool_calls
+        ]
+        return {"messages": errors}
+
+    await _remember(state, config, resolve_llm(config), result)
+
+    acks = [ToolMessage(content="Retrieval submitted.", name=SUBMIT_TOOL, tool_call_id=c["id"]) for c in tool_calls]
+    update = _retrieval_update(result)
+    update["messages"] = [*acks, *update["messages"]]
+    return update
+
+
+def _after_submit(state: RetrieverState) -> str:
+    """End once a submission was accepted, otherwise let the LLM correct it."""
+    return END if state.get("confidence") is not None else "llm_call"
+
+
+async def extract_retrieval(state: RetrieverState, config: RunnableConfig) -> dict:
+    """Fallback structured-output node for when the LLM stops without calling submit_retrieval:
+    reads all messages (including tool results) and produces a validated retrieval dict."""
     logger.debug("extract_retrieval node invoked. message count=%d", len(state["messages"]))
 
-    llm = config.get("configurable", {}).get("llm", None)
-    if llm is None:
-        logger.warning("No 'llm' found in configurable; skipping.")
-        return {}
+    llm = resolve_llm(config)
 
-    llm_structured = llm.with_structured_output(RetrieverOutput)
-    messages = [SystemMessage(content=RETRIEVER_EXTRACT_PROMPT)] + state["messages"]
+    tool_key = _tool_results_key(state["messages"])
+    if tool_key is not None:
+        with _extraction_lock:
+            cached = _extraction_cache.get(tool_key)
+        if cached is not None:
+            logger.debug("Extraction cache hit; skipping the extraction LLM call.")
+            return _retrieval_update(cached)
+
+    llm_structured = _bind_extract(llm)
+    messages = (_EXTRACT_SYSTEM_MSG, *trim_history(state["messages"]))
 
     try:
-        result: RetrieverOutput = llm_structured.invoke(messages)
+        result = await cached_structured_ainvoke(llm, messages, "RetrieverOutput", llm_structured)
     except Exception as exc:
         logger.exception("Structured extraction failed: %s", exc)
         raise
 
-    logger.info(
-        "Retrieval complete — confidence=%.2f, articles_found=%d",
-        result.confidence,
-        result.articles_found,
-    )
-
-    retrieval_msg = AIMessage(
-        content=f"RETRIEVAL_RESULT: confidence={result.confidence:.2f}, articles_found={result.articles_found}"
-    )
-    return {
-        "messages": [retrieval_msg],
-        "confidence": result.confidence,
-        "retrieved_articles": result.retrieved_articles,
-    }
+    await _remember(state, config, llm, result)
+    return _retrieval_update(result)
 
 
 # ---------------------------------------------------------------------------
@@ -188,13 +445,23 @@ def extract_retrieval(state: RetrieverState, config: RunnableConfig) -> dict:
 # ---------------------------------------------------------------------------
 
 builder = StateGraph(RetrieverState)
+builder.add_node("fast_route", fast_route)
+builder.add_node("semantic_lookup", semantic_lookup)
 builder.add_node("llm_call", llm_call)
-builder.add_node("tools", ToolNode(RETRIEVER_TOOLS))
+builder.add_node("tools", tools)
+builder.add_node("submit", submit)
 builder.add_node("extract_retrieval", extract_retrieval)
 
-builder.set_entry_point("llm_call")
-builder.add_conditional_edges("llm_call", _should_continue, {"tools": "tools", "extract_retrieval": "extract_retrieval"})
+builder.set_entry_point("fast_route")
+builder.add_conditional_edges("fast_route", _after_lookup, {"next": "semantic_lookup", END: END})
+builder.add_conditional_edges("semantic_lookup", _after_lookup, {"next": "llm_call", END: END})
+builder.add_conditional_edges(
+    "llm_call",
+    _should_continue,
+    {"tools": "tools", "submit": "submit", "extract_retrieval": "extract_retrieval"},
+)
 builder.add_edge("tools", "llm_call")
+builder.add_conditional_edges("submit", _after_submit, ["llm_call", END])
 builder.add_edge("extract_retrieval", END)
 
 retriever_agent = builder.compile()
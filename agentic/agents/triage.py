@@ -0,0 +1,77 @@
+
+import logging
+from typing import Annotated, List, Optional
+
+from langchain_core.messages import AIMessage
+from langgraph.graph import StateGraph, START, END
+from langgraph.graph.message import add_messages
+from langgraph.types import Send
+from typing_extensions import TypedDict
+
+from agentic.agents.classifier import Classification, classifier_agent
+from agentic.agents.retriever import Article, retriever_agent
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------
+# State schema
+# ---------------------------------------------------------------------------
+
+class TriageState(TypedDict):
+    """Union of the classifier and retriever states; messages from both branches merge via add_messages."""
+    messages: Annotated[list, add_messages]
+    ticket_id: Optional[str]
+    ticket_context: Optional[str]
+    classification: Optional[Classification]
+    confidence: Optional[float]
+    retrieved_articles: Optional[List[Article]]
+
+# ---------------------------------------------------------------------------
+# Node functions
+# ---------------------------------------------------------------------------
+
+def fan_out(state: TriageState) -> list:
+    """Classifier and retriever only read the incoming messages, so run them in the same step."""
+    return [Send("classifier", state), Send("retriever", state)]
+
+
+def join(state: TriageState) -> dict:
+    """Merge both branch results into a single summary message for the supervisor."""
+    classification = state.get("classification")
+    confidence = state.get("confidence")
+    articles = state.get("retrieved_articles") or []
+
+    if classification is not None:
+        classified = (
+            f"CLASSIFIED: issue_type={classification.issue_type}, "
+            f"urgency={classification.urgency}, sentiment={classification.sentiment}"
+        )
+    else:
+        classified = "CLASSIFIED: unavailable"
+
+    if confidence is not None:
+        retrieved = f"RETRIEVAL_RESULT: confidence={confidence:.2f}, articles_found={len(articles)}"
+    else:
+        retrieved = "RETRIEVAL_RESULT: unavailable"
+
+    logger.info("Triage complete — %s | %s", classified, retrieved)
+
+    lines = [classified, retrieved]
+    lines += [f"- {a.title}: {a.summary}" for a in articles]
+    return {"messages": [AIMessage(content="\n".join(lines))]}
+
+# ---------------------------------------------------------------------------
+# Graph assembly
+# ---------------------------------------------------------------------------
+
+builder = StateGraph(TriageState)
+builder.add_node("classifier", classifier_agent)
+builder.add_node("retriever", retriever_agent)
+builder.add_node("join", join)
+
+builder.add_conditional_edges(START, fan_out, ["classifier", "retriever"])
+builder.add_edge(["classifier", "retriever"], "join")
+builder.add_edge("join", END)
+
+triage_agent = builder.compile()
+triage_agent.name = "triage"
@@ -1,12 +1,28 @@
-from .knowledge_tools import search_knowledge_base
-from .ticket_tools import get_ticket_info, update_ticket_status, add_ticket_message
-from .cultpass_tools import get_user_general_info, get_user_reservations
-
-__all__ = [
-    "search_knowledge_base",
-    "get_ticket_info",
-    "update_ticket_status",
-    "add_ticket_message",
-    "get_user_general_info",
-    "get_user_reservations",
-]
+import importlib
+
+# Tools are imported on first access (PEP 562): importing one tool module, e.g. the
+# CultPass or ticket tools, does not pull in the knowledge tools' embedding stack.
+_TOOL_MODULES = {
+    "search_knowledge_base": "knowledge_tools",
+    "batch_search_knowledge_base": "knowledge_tools",
+    "get_ticket_info": "ticket_tools",
+    "update_ticket_status": "ticket_tools",
+    "add_ticket_message": "ticket_tools",
+    "add_ticket_messages": "ticket_tools",
+    "finalize_ticket": "ticket_tools",
+    "get_user_general_info": "cultpass_tools",
+    "get_user_reservations": "cultpass_tools",
+}
+
+__all__ = list(_TOOL_MODULES)
+
+
+def __getattr__(name):
+    module = _TOOL_MODULES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(f".{module}", __name__), name)
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,49 @@
+
+from typing import Dict, Iterable, List
+
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from agentic.tools.cultpass_tools import (
+    get_user_general_info,
+    get_user_subscription,
+    get_user_reservations,
+    search_experiences_by_keyword,
+    get_experience_availability,
+)
+from agentic.tools.knowledge_tools import search_knowledge_base, batch_search_knowledge_base
+from agentic.tools.ticket_tools import (
+    get_ticket_info,
+    update_ticket_status,
+    add_ticket_message,
+    add_ticket_messages,
+    finalize_ticket,
+    get_customer_ticket_history,
+    get_user_preferences,
+    update_user_preferences,
+)
+
+ALL_TOOLS = (
+    get_user_general_info,
+    get_user_subscription,
+    get_user_reservations,
+    search_experiences_by_keyword,
+    get_experience_availability,
+    search_knowledge_base,
+    batch_search_knowledge_base,
+    get_ticket_info,
+    update_ticket_status,
+    add_ticket_message,
+    add_ticket_messages,
+    finalize_ticket,
+    get_customer_ticket_history,
+    get_user_preferences,
+    update_user_preferences,
+)
+
+# OpenAI function schemas, derived once per process from each tool's signature and docstring.
+TOOL_SCHEMAS: Dict[str, dict] = {tool.__name__: convert_to_openai_tool(tool) for tool in ALL_TOOLS}
+
+
+def tool_schemas(tools: Iterable) -> List[dict]:
+    """Return the precomputed OpenAI schemas for ``tools``, in order."""
+    return [TOOL_SCHEMAS[tool.__name__] for tool in tools]
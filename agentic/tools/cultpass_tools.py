@@ -1,32 +1,98 @@
 
 import os
-import sys
 import json
 import logging
+from functools import lru_cache
 from typing import Dict
 from pathlib import Path
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from sqlalchemy import bindparam, create_engine, event, func, select
 
-workspace_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
-if workspace_root not in sys.path:
-    sys.path.insert(0, workspace_root)
-
-load_dotenv()
 if not os.getenv("VOCAREUM_OPENAPI_KEY"):
-    load_dotenv(Path.home() / ".env")
+    load_dotenv()
+    if not os.getenv("VOCAREUM_OPENAPI_KEY"):
+        load_dotenv(Path.home() / ".env")
 
-from utils import get_session
 from data.models import cultpass
+from utils import sql_isoformat
 from settings import settings
 
-from agentic.tools.tools_mcp_server import mcp
+from agentic.tools.tools_mcp_server import mcp_tool, open_vector_store
 
 logger = logging.getLogger(__name__)
 
-engine = create_engine(f"sqlite:///{settings.cultpass_db_path}", echo=False)
-
-@mcp.tool()
+# The tools only read CultPass data, so connections are opened read-only. Pooled
+# connections are reused across tool calls; the pool is sized for the parallel tool
+# node, which may run several lookups at once (a single StaticPool connection would
+# be shared between those threads).
+engine = create_engine(
+    f"sqlite:///file:{settings.cultpass_db_path}?mode=ro&uri=true",
+    echo=False,
+    connect_args={"check_same_thread": False},
+    pool_size=8,
+)
+
+
+@event.listens_for(engine, "connect")
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA query_only=ON")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")
+    cursor.execute("PRAGMA cache_size=-64000")
+    cursor.close()
+
+
+# Core statements built once; the read-only lookups below skip the ORM session and identity map.
+_User, _Reservation, _Experience = cultpass.User, cultpass.Reservation, cultpass.Experience
+_Subscription = cultpass.Subscription
+
+_USER_INFO_STMT = select(
+    _User.user_id, _User.full_name, _User.email, _User.is_blocked
+).where(_User.user_id == bindparam("user_id"))
+
+# The outer join keeps a row for a user without a subscription (subscription_id is NULL).
+# Status and tier are lower-cased by SQLite, so callers can compare them directly.
+_USER_SUBSCRIPTION_STMT = (
+    select(
+        _User.user_id,
+        _Subscription.subscription_id,
+        func.lower(_Subscription.status).label("status"),
+        func.lower(_Subscription.tier).label("tier"),
+        sql_isoformat(_Subscription.started_at, "started_at"),
+        sql_isoformat(_Subscription.ended_at, "ended_at"),
+    )
+    .select_from(_User)
+    .outerjoin(_Subscription, _Subscription.user_id == _User.user_id)
+    .where(_User.user_id == bindparam("user_id"))
+)
+
+_EXPERIENCE_STMT = select(
+    _Experience.title,
+    _Experience.location,
+    sql_isoformat(_Experience.when, "when_iso"),
+    _Experience.is_premium,
+    _Experience.slots_available,
+).where(_Experience.experience_id == bindparam("experience_id"))
+
+# Outer joins keep one row for a user without reservations, so "unknown user" and
+# "no reservations" stay distinguishable in a single round-trip.
+_USER_RESERVATIONS_STMT = (
+    select(
+        _Reservation.status,
+        _Experience.experience_id,
+        _Experience.title,
+        _Experience.location,
+        sql_isoformat(_Experience.when, "when_iso"),
+        _Experience.is_premium,
+    )
+    .select_from(_User)
+    .outerjoin(_Reservation, _Reservation.user_id == _User.user_id)
+    .outerjoin(_Experience, _Experience.experience_id == _Reservation.experience_id)
+    .where(_User.user_id == bindparam("user_id"))
+)
+
+@mcp_tool()
 def get_user_general_info(user_id: str) -> Dict[str, str]:
     """
     Retrieve general information about a CultPass user.
@@ -44,30 +110,30 @@ def get_user_general_info(user_id: str) -> Dict[str, str]:
         - error: str - An error message if the user is not found or an exception occurs
     """
     try:
-        with get_session(engine) as session:
-            user = session.query(cultpass.User).filter_by(user_id=user_id).first()
+        with engine.connect() as conn:
+            user = conn.execute(_USER_INFO_STMT, {"user_id": user_id}).first()
 
-            if not user:
-                return {"error": f"No CultPass user found with id: {user_id}"}
+        if not user:
+            return {"error": f"No CultPass user found with id: {user_id}"}
 
-            blocked_flag = "BLOCKED" if user.is_blocked else "ACTIVE"
+        blocked_flag = "BLOCKED" if user.is_blocked else "ACTIVE"
 
-            info = {
-                "user_id": user.user_id,
-                "name": user.full_name,
-                "email": user.email,
-                "account_status": blocked_flag
-            }
+        info = {
+            "user_id": user.user_id,
+            "name": user.full_name,
+            "email": user.email,
+            "account_status": blocked_flag
+        }
 
-            logger.info(f"Retrieved general info for user {user_id}")
-            return info
+        logger.info("Retrieved general info for user %s", user_id)
+        return info
 
     except Exception as e:
-        logger.error(f"Error retrieving general info for user {user_id}: {e}")
+        logger.error("Error retrieving general info for user %s: %s", user_id, e)
         return {"error": f"An error occurred while retrieving general info for user {user_id}."}
 
 
-@mcp.tool()
+@mcp_tool()
 def get_user_subscription(user_id: str) -> Dict[str, str]:
     """
     Retrieve the subscription status of a CultPass user
@@ -79,40 +145,40 @@ def get_user_subscription(user_id: str) -> Dict[str, str]:
         A dictionary with the user's subscription information.
 
         - user_id: str - The CultPass user ID
-        - subscription_status: str - The user's subscription status or None if not subscribed
-        - subscription_tier: str - The user's subscription tier or None if not subscribed
+        - subscription_status: str - The user's subscription status in lower case (e.g. "active") or None if not subscribed
+        - subscription_tier: str - The user's subscription tier in lower case (e.g. "premium") or None if not subscribed
         - subscription_started_at: str - The start date of the user's subscription in ISO format or None if not subscribed
         - subscription_ended_at: str - The end date of the user's subscription in ISO format or None if not subscribed
         - error: str - An error message if the user is not found or an exception occurs
     """
 
     try:
-        with get_session(engine) as session:
-            user = session.query(cultpass.User).filter_by(user_id=user_id).first()
-
-            if not user:
-                return {"error": f"No CultPass user found with id: {user_id}"}
-
-            # Check for user subscription:
-            if user.subscription:
-                logger.info(f"User {user_id} subscription status: {user.subscription}")
-                return {
-                    "user_id": user_id,
-                    "subscription_status": user.subscription.status,
-                    "subscription_tier": user.subscription.tier,
-                    "subscription_started_at": user.subscription.started_at.isoformat(),
-                    "subscription_ended_at": user.subscription.ended_at.isoformat() if user.subscription.ended_at else None
-                }
-            else:
-                logger.info(f"User {user_id} has no active subscription.")
-                return {"error": f"User {user_id} has no active subscription."}
+        with engine.connect() as conn:
+            row = conn.execute(_USER_SUBSCRIPTION_STMT, {"user_id": user_id}).first()
+
+        if not row:
+            return {"error": f"No CultPass user found with id: {user_id}"}
+
+        # Check for user subscription:
+        if row.subscription_id is not None:
+            logger.info("User %s subscription status: %s (%s)", user_id, row.status, row.tier)
+            return {
+                "user_id": user_id,
+                "subscription_status": row.status,
+                "subscription_tier": row.tier,
+                "subscription_started_at": row.started_at,
+                "subscription_ended_at": row.ended_at
+            }
+        else:
+            logger.info("User %s has no active subscription.", user_id)
+            return {"error": f"User {user_id} has no active subscription."}
 
     except Exception as e:
-        logger.error(f"Error retrieving subscription status for user {user_id}: {e}")
+        logger.error("Error retrieving subscription status for user %s: %s", user_id, e)
         return {"error": f"An error occurred while retrieving subscription status for user {user_id}."}
 
 
-@mcp.tool()
+@mcp_tool()
 def get_user_reservations(user_id: str) -> Dict[str, str]:
     """
     Retrieve the reservation history of a CultPass user.
@@ -129,40 +195,55 @@ def get_user_reservations(user_id: str) -> Dict[str, str]:
         }
     """
     try:
-        with get_session(engine) as session:
-            user = session.query(cultpass.User).filter_by(user_id=user_id).first()
-
-            if not user:
-                return {"error": f"No CultPass user found with id: {user_id}"}
-
-            if user.reservations:
-                logger.info(f"Retrieved {len(user.reservations)} reservations for user {user_id}")
-                reservations = list()
-
-                for res in user.reservations:
-                    exp = res.experience
-                    reservations.append({
-                        "experience_title": exp.title if exp else "N/A",
-                        "experience_location": exp.location if exp else "N/A",
-                        "experience_time": exp.when.isoformat() if exp and exp.when else "N/A",
-                        "experience_is_premium": exp.is_premium if exp else False,
-                        "reservation_status": res.status
-                    })
-
-                return {
-                    "user_id": user_id,
-                    "reservations": reservations
+        with engine.connect() as conn:
+            rows = conn.execute(_USER_RESERVATIONS_STMT, {"user_id": user_id}).all()
+
+        if not rows:
+            return {"error": f"No CultPass user found with id: {user_id}"}
+
+        # A user without reservations comes back as a single all-NULL reservation row.
+        rows = [row for row in rows if row.status is not None]
+
+        if rows:
+            logger.info("Retrieved %d reservations for user %s", len(rows), user_id)
+            reservations = [
+                {
+                    "experience_title": row.title if row.experience_id else "N/A",
+                    "experience_location": row.location if row.experience_id else "N/A",
+                    "experience_time": row.when_iso if row.experience_id and row.when_iso else "N/A",
+                    "experience_is_premium": row.is_premium if row.experience_id else False,
+                    "reservation_status": row.status
                 }
-            else:
-                logger.info(f"User {user_id} has no reservations.")
-                return {"error": f"User {user_id} has no reservations."}
+                for row in rows
+            ]
+
+            return {
+                "user_id": user_id,
+                "reservations": reservations
+            }
+        else:
+            logger.info("User %s has no reservations.", user_id)
+            return {"error": f"User {user_id} has no reservations."}
 
     except Exception as e:
-        logger.error(f"Error retrieving reservations for user {user_id}: {e}")
+        logger.error("Error retrieving reservations for user %s: %s", user_id, e)
         return {"error": f"An error occurred while retrieving reservations for user {user_id}."}
 
 
-@mcp.tool()
+@lru_cache(maxsize=1)
+def _experience_store():
+    """Open the experiences collection once; every search reuses the client and its embeddings."""
+    from langchain_openai import OpenAIEmbeddings
+
+    embeddings = OpenAIEmbeddings(
+        base_url="https://openai.vocareum.com/v1",
+        api_key=os.getenv("VOCAREUM_OPENAPI_KEY")
+    )
+
+    return open_vector_store("cultpass_experiences", settings.experience_chroma_db_path, embeddings)
+
+
+@mcp_tool()
 def search_experiences_by_keyword(keyword: str) -> Dict[str, str]:
     """
     Search for CultPass experiences matching a keyword using vector similarity search.
@@ -178,36 +259,22 @@ def search_experiences_by_keyword(keyword: str) -> Dict[str, str]:
         }
     """
     try:
-        from langchain_openai import OpenAIEmbeddings
-        from langchain_chroma import Chroma
-
-        embeddings = OpenAIEmbeddings(
-            base_url="https://openai.vocareum.com/v1",
-            api_key=os.getenv("VOCAREUM_OPENAPI_KEY")
-        )
-
-        vector_store = Chroma(
-            collection_name="cultpass_experiences",
-            embedding_function=embeddings,
-            persist_directory=settings.experience_chroma_db_path
-        )
-
-        results = vector_store.similarity_search(keyword, k=5)
+        results = _experience_store().similarity_search(keyword, k=5)
 
         if not results:
             return {"experiences": [], "message": f"No experiences found matching '{keyword}'."}
 
         experiences = [json.loads(doc.page_content) for doc in results]
 
-        logger.info(f"Found {len(experiences)} experiences matching keyword '{keyword}'")
+        logger.info("Found %d experiences matching keyword '%s'", len(experiences), keyword)
         return {"experiences": experiences}
 
     except Exception as e:
-        logger.error(f"Error searching experiences by keyword '{keyword}': {e}")
+        logger.error("Error searching experiences by keyword '%s': %s", keyword, e)
         return {"error": f"An error occurred while searching for experiences matching '{keyword}'."}
 
 
-@mcp.tool()
+@mcp_tool()
 def get_experience_availability(experience_id: str) -> Dict[str, str]:
     """
     Check the availability and details of a CultPass experience by ID.
@@ -226,23 +293,23 @@ def get_experience_availability(experience_id: str) -> Dict[str, str]:
         }
     """
     try:
-        with get_session(engine) as session:
-            experience = session.query(cultpass.Experience).filter_by(experience_id=experience_id).first()
+        with engine.connect() as conn:
+            experience = conn.execute(_EXPERIENCE_STMT, {"experience_id": experience_id}).first()
 
-            if not experience:
-                return {"error": f"No experience found with ID: {experience_id}"}
+        if not experience:
+            return {"error": f"No experience found with ID: {experience_id}"}
 
-            logger.info(f"Retrieved experience with ID: {experience_id}")
+        logger.info("Retrieved experience with ID: %s", experience_id)
 
-            return {
-                "experience_title": experience.title,
-                "experience_location": experience.location,
-                "experience_time": experience.when.isoformat() if experience.when else "N/A",
-                "experience_is_premium": experience.is_premium,
-                "slots_available": experience.slots_available
-            }
+        return {
+            "experience_title": experience.title,
+            "experience_location": experience.location,
+            "experience_time": experience.when_iso or "N/A",
+            "experience_is_premium": experience.is_premium,
+            "slots_available": experience.slots_available
+        }
 
     except Exception as e:
-        logger.error(f"Error retrieving experiences for '{experience_id}': {e}")
+        logger.error("Error retrieving experiences for '%s': %s", experience_id, e)
         return {"error": f"An error occurred while retrieving experience details for '{experience_id}'."}
 
@@ -1,30 +1,105 @@
 
 import os
-import sys
 import json
+import asyncio
 import logging
-from typing import Dict
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, List, Tuple
 from pathlib import Path
 from dotenv import load_dotenv
 
+import numpy as np
+from cachetools import LRUCache
 from langchain_openai import OpenAIEmbeddings
 from langchain_chroma import Chroma
 
-workspace_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
-if workspace_root not in sys.path:
-    sys.path.insert(0, workspace_root)
-
-load_dotenv()
 if not os.getenv("VOCAREUM_OPENAPI_KEY"):
-    load_dotenv(Path.home() / ".env")
+    load_dotenv()
+    if not os.getenv("VOCAREUM_OPENAPI_KEY"):
+        load_dotenv(Path.home() / ".env")
 
 from settings import settings
-from agentic.tools.tools_mcp_server import mcp
+from agentic.tools.tools_mcp_server import mcp_tool, open_vector_store
 
 logger = logging.getLogger(__name__)
 
+# Shared by every batch search so concurrent batches do not each spawn their own threads.
+_search_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="kb-search")
+
+
+@lru_cache(maxsize=1)
+def _vector_store() -> Chroma:
+    """Open the knowledge collection once; every search reuses the client and its embeddings."""
+    embeddings = OpenAIEmbeddings(
+        base_url="https://openai.vocareum.com/v1",
+        api_key=os.getenv("VOCAREUM_OPENAPI_KEY")
+    )
+
+    return open_vector_store("udahub_knowledge", settings.knowledge_chroma_db_path, embeddings)
+
+
+@lru_cache(maxsize=2048)
+def _parse_article(page_content: str) -> Dict:
+    """Parse a stored article once; the KB is static, so the same hits recur. Treat the result as read-only."""
+    return json.loads(page_content)
+
+
+# Query text -> embedding, so repeated searches for the same text skip the remote call.
+# Vectors are kept as float32 arrays: ~6 KB each instead of ~50 KB as a list of Python floats.
+_query_vectors: LRUCache = LRUCache(maxsize=1024)
+_query_vectors_lock = threading.Lock()
+
+
+def _cached_vectors(queries: List[str]) -> Dict:
+    with _query_vectors_lock:
+        return {q: _query_vectors.get(q) for q in queries}
+
+
+def _store_vectors(vectors: Dict, missing: List[str], embedded: List[List[float]]) -> None:
+    for query, vector in zip(missing, embedded):
+        vectors[query] = np.asarray(vector, dtype=np.float32)
+    with _query_vectors_lock:
+        _query_vectors.update((q, vectors[q]) for q in missing)
+
 
-@mcp.tool()
+def _embed_many(queries: List[str]) -> List[np.ndarray]:
+    """Embed queries, sending every uncached one in a single embed_documents request."""
+    vectors = _cached_vectors(queries)
+    missing = [q for q, v in vectors.items() if v is None]
+    if missing:
+        _store_vectors(vectors, missing, _vector_store().embeddings.embed_documents(missing))
+    return [vectors[q] for q in queries]
+
+
+async def _aembed_many(queries: List[str]) -> List[np.ndarray]:
+    """Async ``_embed_many``: the embedding request runs on the event loop instead of a thread."""
+    vectors = _cached_vectors(queries)
+    missing = [q for q, v in vectors.items() if v is None]
+    if missing:
+        _store_vectors(vectors, missing, await _vector_store().embeddings.aembed_documents(missing))
+    return [vectors[q] for q in queries]
+
+
+def _normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive form of a query, used as its cache key."""
+    return " ".join(query.lower().split())
+
+
+@lru_cache(maxsize=512)
+def _search_cached(query: str) -> Tuple[str, ...]:
+    """
+    Stored contents of the top 3 articles for a normalised query.
+
+    The KB is static, so a repeated query is answered without embedding or searching
+    again. Failures raise and are therefore never cached.
+    """
+    results = _vector_store().similarity_search_by_vector(_embed_many([query])[0].tolist(), k=3)
+    return tuple(doc.page_content for doc in results)
+
+
+@mcp_tool()
 def search_knowledge_base(query: str) -> Dict:
     """Search the CultPass knowledge base for articles relevant to the query using vector similarity search.
 
@@ -39,27 +114,89 @@ def search_knowledge_base(query: str) -> Dict:
         }
     """
     try:
-        embeddings = OpenAIEmbeddings(
-            base_url="https://openai.vocareum.com/v1",
-            api_key=os.getenv("VOCAREUM_OPENAPI_KEY")
-        )
-
-        vector_store = Chroma(
-            collection_name="udahub_knowledge",
-            embedding_function=embeddings,
-            persist_directory=settings.knowledge_chroma_db_path
-        )
-
-        results = vector_store.similarity_search(query, k=3)
+        results = _search_cached(_normalize_query(query))
 
         if not results:
             return {"articles": [], "message": f"No knowledge articles found for the given query."}
 
-        articles = [json.loads(doc.page_content) for doc in results]
+        articles = [_parse_article(page_content) for page_content in results]
 
-        logger.info(f"Found {len(articles)} knowledge articles matching query '{query}'")
+        logger.info("Found %d knowledge articles matching query '%s'", len(articles), query)
         return {"articles": articles}
 
     except Exception as e:
-        logger.error(f"Error searching knowledge base for query '{query}': {e}")
+        logger.error("Error searching knowledge base for query '%s': %s", query, e)
         return {"error": f"An error occurred while searching the knowledge base."}
+
+
+def _batch_results(queries: List[str], results: List[Dict]) -> Dict:
+    """Pair each query with its result; an article already returned for an earlier query is listed by title only."""
+    first_seen: Dict[str, str] = {}
+    merged = []
+    for query, result in zip(queries, results):
+        articles = result.get("articles")
+        if articles:
+            deduped = []
+            for article in articles:
+                title = article.get("title")
+                if title in first_seen and first_seen[title] != query:
+                    deduped.append({"title": title, "duplicate_of_query": first_seen[title]})
+                else:
+                    first_seen.setdefault(title, query)
+                    deduped.append(article)
+            result = {**result, "articles": deduped}
+        merged.append({"query": query, **result})
+    return {"results": merged}
+
+
+@mcp_tool()
+def batch_search_knowledge_base(queries: List[str]) -> Dict:
+    """Run several knowledge base searches concurrently, e.g. a query and its rephrasings.
+
+    Args:
+        queries: Natural-language questions or keyword phrasings to search for (2-3 is typical).
+
+    Returns:
+        A dictionary with one search result per query, in the same order.
+        {
+            "results": list - Each entry has the "query" and the search_knowledge_base result
+                              ("articles" or "error"). An article already returned for an
+                              earlier query appears only as {"title", "duplicate_of_query"}.
+        }
+    """
+    if not queries:
+        return {"results": []}
+
+    try:
+        # One embedding request for the whole batch; the searches below then hit the cache.
+        _embed_many([_normalize_query(q) for q in queries])
+    except Exception as e:
+        logger.warning("Batch embedding failed, falling back to per-query embedding: %s", e)
+
+    results = list(_search_pool.map(search_knowledge_base, queries))
+
+    logger.info("Ran %d knowledge base searches concurrently", len(queries))
+    return _batch_results(queries, results)
+
+
+async def abatch_search_knowledge_base(queries: List[str]) -> Dict:
+    """Async variant of batch_search_knowledge_base with the same arguments and result.
+
+    The batch is embedded with one awaited request and the Chroma lookups run on the
+    search pool, so an event-loop caller never parks a thread on the embedding round-trip.
+    """
+    if not queries:
+        return {"results": []}
+
+    try:
+        await _aembed_many([_normalize_query(q) for q in queries])
+    except Exception as e:
+        logger.warning("Batch embedding failed, falling back to per-query embedding: %s", e)
+
+    loop = asyncio.get_running_loop()
+    results = await asyncio.gather(
+        *(loop.run_in_executor(_search_pool, search_knowledge_base, q) for q in queries)
+    )
+
+    logger.info("Ran %d knowledge base searches concurrently", len(queries))
+    return _batch_results(queries, results)
@@ -1,27 +1,172 @@
 
-import os
-import sys
+import copy
+import functools
+import inspect
+import threading
 import uuid
 import logging
-from typing import Dict
-from sqlalchemy import create_engine
-
-workspace_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
-if workspace_root not in sys.path:
-    sys.path.insert(0, workspace_root)
-
-from utils import get_session
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Sequence, Tuple
+from cachetools import TTLCache
+from sqlalchemy import and_, func, insert, lambda_stmt, literal_column, select
+from sqlalchemy.orm import joinedload, raiseload, selectinload
+
+from utils import get_engine, get_session, sql_isoformat
 from data.models import udahub
 from settings import settings
 
-from agentic.tools.tools_mcp_server import mcp
+from agentic.tools.tools_mcp_server import mcp_tool
 
 logger = logging.getLogger(__name__)
 
-engine = create_engine(f"sqlite:///{settings.udahub_db_path}", echo=False)
+# Shared with main.py's seeding; connections are opened in WAL mode by get_engine.
+engine = get_engine(settings.udahub_db_path)
+
+
+def _loader_options(*eager) -> tuple:
+    """The given eager loads, plus ``raiseload('*')`` when ``settings.debug_raiseload`` is on."""
+    return (*eager, raiseload("*")) if settings.debug_raiseload else eager
+
+
+# ---------------------------------------------------------------------------
+# Read cache
+# ---------------------------------------------------------------------------
+
+READ_CACHE_TTL = 60
+
+# Entries are keyed by the version of the ticket they depend on; a write bumps the
+# version, so readers never see a result cached before it.
+_read_cache: TTLCache = TTLCache(maxsize=2048, ttl=READ_CACHE_TTL)
+_versions: Dict[str, int] = defaultdict(int)
+_cache_lock = threading.Lock()
+_ANY_TICKET = "*"
+
+
+def _cached_read(version_key: Callable[[dict], str]):
+    """
+    Memoise a read tool per engine and arguments until the ticket it depends on is written.
+
+    ``version_key`` maps the bound arguments to the ticket id whose writes invalidate the
+    result (``_ANY_TICKET`` for reads spanning several tickets). Error results are not
+    cached, and callers get a copy so they cannot mutate the cached dict.
+    """
+    def decorator(fn):
+        signature = inspect.signature(fn)
 
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            scope = version_key(bound.arguments)
+
+            with _cache_lock:
+                version = _versions[scope]
+                key = (engine, fn.__name__, tuple(bound.arguments.values()), version)
+                result = _read_cache.get(key)
+
+            if result is None:
+                result = fn(*args, **kwargs)
+                if "error" not in result:
+                    with _cache_lock:
+                        if _versions[scope] == version:
+                            _read_cache[key] = result
+
+            return copy.deepcopy(result)
+
+        return wrapper
+
+    return decorator
+
+
+@contextmanager
+def _ticket_write(ticket_id: str):
+    """
+    Session for a write to ``ticket_id``; cached reads of it are invalidated once the commit lands.
+
+    A writer that turns out to change nothing sets ``session.info["unchanged"]`` so the
+    cache is left intact.
+    """
+    info: dict = {}
+    try:
+        with get_session(engine) as session:
+            info = session.info
+            yield session
+    finally:
+        if not info.get("unchanged"):
+            with _cache_lock:
+                _versions[ticket_id] += 1
+                _versions[_ANY_TICKET] += 1
 
-@mcp.tool()
+
+def _merge_tags(*tag_lists: str) -> str:
+    """
+    Join comma-separated tag lists in order, stripped and without empty entries.
+
+    Duplicates are matched case-insensitively; the first spelling seen is kept, so
+    stored tags are never rewritten.
+    """
+    merged: Dict[str, str] = {}
+    for tags in tag_lists:
+        for tag in (tags or "").split(","):
+            tag = tag.strip()
+            if tag:
+                merged.setdefault(tag.casefold(), tag)
+    return ", ".join(merged.values())
+
+
+def _user_by_external_id(session, external_user_id: str):
+    """
+    ``(user_id, user_name)`` row of the first UdaHub user with this CultPass id, or None.
+
+    Only the two columns the tools read are selected (no ORM entity), and the SELECT
+    is compiled once per process.
+    """
+    stmt = lambda_stmt(
+        lambda: select(udahub.User.user_id, udahub.User.user_name)
+        .where(udahub.User.external_user_id == external_user_id)
+        .limit(1)
+    )
+    return session.execute(stmt).first()
+
+
+def _insert_messages(session, ticket_id: str, entries: Sequence[Tuple[udahub.RoleEnum, str]]) -> List[str]:
+    """
+    Append ``(role, content)`` messages with one executemany INSERT; returns their new ids in order.
+
+    Ids are bare 32-character hex UUIDs (the column is TEXT, so older hyphenated ids still coexist).
+    """
+    rows = [
+        {"message_id": uuid.uuid4().hex, "ticket_id": ticket_id, "role": role, "content": content}
+        for role, content in entries
+    ]
+    if rows:
+        session.execute(insert(udahub.TicketMessage), rows)
+    return [row["message_id"] for row in rows]
+
+# Accepted role names -> RoleEnum; anything else is stored as 'agent'.
+_MESSAGE_ROLES = {name: udahub.RoleEnum[name] for name in ("agent", "user", "system")}
+_REPLY_ROLES = {name: udahub.RoleEnum[name] for name in ("agent", "ai", "system")}
+
+# Newest AI reply per ticket (rn == 1); rowid breaks ties between messages written in the same second.
+_last_ai_message = (
+    select(
+        udahub.TicketMessage.ticket_id,
+        udahub.TicketMessage.content,
+        func.row_number()
+        .over(
+            partition_by=udahub.TicketMessage.ticket_id,
+            order_by=(udahub.TicketMessage.created_at.desc(), literal_column("rowid").desc()),
+        )
+        .label("rn"),
+    )
+    .where(udahub.TicketMessage.role == udahub.RoleEnum.ai)
+    .subquery()
+)
+
+
+@mcp_tool()
+@_cached_read(lambda args: args["ticket_id"])
 def get_ticket_info(ticket_id: str) -> Dict:
     """
     Retrieve full details of a support ticket including all messages and metadata.
@@ -46,7 +191,15 @@ def get_ticket_info(ticket_id: str) -> Dict:
     """
     try:
         with get_session(engine) as session:
-            ticket = session.query(udahub.Ticket).filter_by(ticket_id=ticket_id).first()
+            ticket = session.get(
+                udahub.Ticket,
+                ticket_id,
+                options=_loader_options(
+                    joinedload(udahub.Ticket.ticket_metadata),
+                    joinedload(udahub.Ticket.user),
+                    selectinload(udahub.Ticket.messages),
+                ),
+            )
 
             if not ticket:
                 return {"error": f"No ticket found with id: {ticket_id}"}
@@ -59,7 +212,7 @@ def get_ticket_info(ticket_id: str) -> Dict:
                 for msg in ticket.messages
             ]
 
-            logger.info(f"Retrieved ticket {ticket_id}")
+            logger.info("Retrieved ticket %s", ticket_id)
 
             return {
                 "ticket_id": ticket.ticket_id,
@@ -74,11 +227,11 @@ def get_ticket_info(ticket_id: str) -> Dict:
             }
 
     except Exception as e:
-        logger.error(f"Error retrieving ticket {ticket_id}: {e}")
+        logger.error("Error retrieving ticket %s: %s", ticket_id, e)
         return {"error": f"An error occurred while retrieving ticket {ticket_id}."}
 
 
-@mcp.tool()
+@mcp_tool()
 def update_ticket_status(
     ticket_id: str,
     status: str,
@@ -105,23 +258,30 @@ def update_ticket_status(
         }
     """
     try:
-        with get_session(engine) as session:
-            meta = session.query(udahub.TicketMetadata).filter_by(ticket_id=ticket_id).first()
+        with _ticket_write(ticket_id) as session:
+            meta = session.get(udahub.TicketMetadata, ticket_id)
 
             if not meta:
                 return {"error": f"No ticket metadata found for ticket_id: {ticket_id}"}
 
-            meta.status = status
+            # Only assign changed values, so a no-op update leaves nothing to flush.
+            if status != meta.status:
+                meta.status = status
 
-            if issue_type:
+            if issue_type and issue_type != meta.main_issue_type:
                 meta.main_issue_type = issue_type
 
             if tags:
-                existing = set(meta.tags.split(",")) if meta.tags else set()
-                new_tags = {t.strip() for t in tags.split(",")}
-                meta.tags = ", ".join(sorted(existing | new_tags))
+                merged = _merge_tags(meta.tags, tags)
+                if merged != meta.tags:
+                    meta.tags = merged
 
-            logger.info(f"Updated ticket {ticket_id} status to '{status}'")
+            if not session.is_modified(meta):
+                # Re-asserting the current state: nothing to write, nothing to invalidate.
+                session.info["unchanged"] = True
+                logger.debug("Ticket %s already has status '%s'", ticket_id, status)
+            else:
+                logger.info("Updated ticket %s status to '%s'", ticket_id, status)
 
             return {
                 "ticket_id": ticket_id,
@@ -131,11 +291,11 @@ def update_ticket_status(
             }
 
     except Exception as e:
-        logger.error(f"Error updating ticket {ticket_id}: {e}")
+        logger.error("Error updating ticket %s: %s", ticket_id, e)
         return {"error": f"An error occurred while updating ticket {ticket_id}."}
 
 
-@mcp.tool()
+@mcp_tool()
 def add_ticket_message(ticket_id: str, content: str, role: str = "agent") -> Dict:
     """
     Append a new message to a ticket's conversation thread.
@@ -154,38 +314,122 @@ def add_ticket_message(ticket_id: str, content: str, role: str = "agent") -> Dic
             "error": str - An error message if the operation fails
         }
     """
+    result = add_ticket_messages(ticket_id, [{"role": role, "content": content}])
+    if "error" in result:
+        return result
+
+    return {
+        "ticket_id": ticket_id,
+        "role": result["roles"][0],
+        "message_id": result["message_ids"][0]
+    }
+
+
+@mcp_tool()
+def add_ticket_messages(ticket_id: str, messages: List[Dict[str, str]]) -> Dict:
+    """
+    Append several messages to a ticket's conversation thread in one transaction.
+
+    Use this instead of repeated add_ticket_message calls when a turn writes more than one message.
+
+    Args:
+        ticket_id: The UUID of the ticket.
+        messages: Messages to append, in order. Each has 'content' and an optional 'role' —
+            'agent', 'user', or 'system' (default: 'agent').
+
+    Returns:
+        A dictionary confirming the messages were added or describing an error.
+        {
+            "ticket_id": str,
+            "roles": List[str] - The stored role of each message,
+            "message_ids": List[str] - IDs of the appended messages, in order,
+            "error": str - An error message if the operation fails
+        }
+    """
     try:
-        with get_session(engine) as session:
+        with _ticket_write(ticket_id) as session:
+
+            entries = [
+                (
+                    _MESSAGE_ROLES.get((message.get("role") or "agent").lower(), udahub.RoleEnum.agent),
+                    message.get("content", ""),
+                )
+                for message in messages
+            ]
+            roles = [role_enum.name for role_enum, _ in entries]
+
+            message_ids = _insert_messages(session, ticket_id, entries)
+
+            logger.info("Added %d message(s) to ticket %s", len(message_ids), ticket_id)
+            return {
+                "ticket_id": ticket_id,
+                "roles": roles,
+                "message_ids": message_ids
+            }
 
-            role_lower = role.lower()
-            if role_lower not in ("agent", "user", "system"):
-                role_lower = "agent"
+    except Exception as e:
+        logger.error("Error adding messages to ticket %s: %s", ticket_id, e)
+        return {"error": f"An error occurred while adding messages to ticket {ticket_id}."}
 
-            role_enum = udahub.RoleEnum[role_lower]
-            message_id = str(uuid.uuid4())
 
-            message = udahub.TicketMessage(
-                message_id=message_id,
-                ticket_id=ticket_id,
-                role=role_enum,
-                content=content,
-            )
+@mcp_tool()
+def finalize_ticket(
+    ticket_id: str,
+    status: str,
+    message: str,
+    message_role: str = "agent",
+    note: str = "",
+) -> Dict:
+    """
+    Append the final reply (and optionally an internal note) and set the ticket status in one transaction.
+
+    Use this instead of separate add_ticket_message + update_ticket_status calls when closing out a turn.
+
+    Args:
+        ticket_id: The UUID of the ticket.
+        status: New status value. Valid values: 'open', 'in_progress', 'resolved', 'escalated', 'closed'.
+        message: Customer-facing message text to append.
+        message_role: Who is sending the message — 'agent', 'ai', or 'system' (default: 'agent').
+        note: Optional internal note (e.g. the escalation note for the support lead), stored with role 'system'.
+
+    Returns:
+        A dictionary confirming the update or describing an error.
+        {
+            "ticket_id": str,
+            "status": str,
+            "message_ids": List[str] - IDs of the appended messages (note first, if given),
+            "error": str - An error message if the operation fails
+        }
+    """
+    try:
+        with _ticket_write(ticket_id) as session:
+            meta = session.get(udahub.TicketMetadata, ticket_id)
 
-            session.add(message)
+            if not meta:
+                return {"error": f"No ticket metadata found for ticket_id: {ticket_id}"}
+
+            entries = [(udahub.RoleEnum.system, note)] if note else []
+            entries.append((_REPLY_ROLES.get(message_role.lower(), udahub.RoleEnum.agent), message))
+
+            message_ids = _insert_messages(session, ticket_id, entries)
+
+            meta.status = status
+
+            logger.info("Finalized ticket %s: %d message(s), status '%s'", ticket_id, len(message_ids), status)
 
-            logger.info(f"Added message to ticket {ticket_id} as role='{role_lower}'")
             return {
                 "ticket_id": ticket_id,
-                "role": role_lower,
-                "message_id": message_id
+                "status": status,
+                "message_ids": message_ids
             }
 
     except Exception as e:
-        logger.error(f"Error adding message to ticket {ticket_id}: {e}")
-        return {"error": f"An error occurred while adding a message to ticket {ticket_id}."}
+        logger.error("Error finalizing ticket %s: %s", ticket_id, e)
+        return {"error": f"An error occurred while finalizing ticket {ticket_id}."}
 
 
-@mcp.tool()
+@mcp_tool()
+@_cached_read(lambda args: _ANY_TICKET)
 def get_customer_ticket_history(external_user_id: str, limit: int = 5) -> Dict:
     """
     Retrieve the support history of a returning customer across all their past tickets.
@@ -211,11 +455,7 @@ def get_customer_ticket_history(external_user_id: str, limit: int = 5) -> Dict:
     """
     try:
         with get_session(engine) as session:
-            user = (
-                session.query(udahub.User)
-                .filter_by(external_user_id=external_user_id)
-                .first()
-            )
+            user = _user_by_external_id(session, external_user_id)
 
             if not user:
                 return {
@@ -225,36 +465,35 @@ def get_customer_ticket_history(external_user_id: str, limit: int = 5) -> Dict:
                     "message": "No UdaHub account found for this external user ID.",
                 }
 
-            tickets = (
-                session.query(udahub.Ticket)
-                .filter_by(user_id=user.user_id)
+            user_id = user.user_id
+            rows = session.execute(lambda_stmt(
+                lambda: select(
+                    udahub.Ticket.ticket_id,
+                    sql_isoformat(udahub.Ticket.created_at, "created_at"),
+                    udahub.Ticket.channel,
+                    udahub.TicketMetadata.status,
+                    udahub.TicketMetadata.main_issue_type.label("issue_type"),
+                    udahub.TicketMetadata.tags,
+                    _last_ai_message.c.content.label("last_ai_message"),
+                )
+                .outerjoin(udahub.TicketMetadata)
+                .outerjoin(
+                    _last_ai_message,
+                    and_(
+                        _last_ai_message.c.ticket_id == udahub.Ticket.ticket_id,
+                        _last_ai_message.c.rn == 1,
+                    ),
+                )
+                .where(udahub.Ticket.user_id == user_id)
                 .order_by(udahub.Ticket.created_at.desc())
                 .limit(limit)
-                .all()
-            )
+            )).mappings()
 
-            history = []
-            for ticket in tickets:
-                meta = ticket.ticket_metadata
-                ai_messages = [
-                    msg.content
-                    for msg in ticket.messages
-                    if msg.role == udahub.RoleEnum.ai
-                ]
-                last_ai_message = ai_messages[-1] if ai_messages else None
-
-                history.append({
-                    "ticket_id": ticket.ticket_id,
-                    "created_at": ticket.created_at.isoformat() if ticket.created_at else None,
-                    "channel": ticket.channel,
-                    "status": meta.status if meta else None,
-                    "issue_type": meta.main_issue_type if meta else None,
-                    "tags": meta.tags if meta else None,
-                    "last_ai_message": last_ai_message,
-                })
+            # Columns are labelled with the output keys and created_at is formatted in SQL.
+            history = [dict(row) for row in rows]
 
             logger.info(
-                f"Retrieved {len(history)} past tickets for external_user_id='{external_user_id}'"
+                "Retrieved %d past tickets for external_user_id='%s'", len(history), external_user_id
             )
             return {
                 "external_user_id": external_user_id,
@@ -264,11 +503,11 @@ def get_customer_ticket_history(external_user_id: str, limit: int = 5) -> Dict:
             }
 
     except Exception as e:
-        logger.error(f"Error retrieving ticket history for '{external_user_id}': {e}")
-        return {"error": f"An error occurred while retrieving ticket history."}
+        logger.error("Error retrieving ticket history for '%s': %s", external_user_id, e)
+        return {"error": "An error occurred while retrieving ticket history."}
 
 
-@mcp.tool()
+@mcp_tool()
 def get_user_preferences(external_user_id: str) -> Dict:
     """
     Retrieve stored long-term preferences for a customer (language, channel, notes).
@@ -292,15 +531,11 @@ def get_user_preferences(external_user_id: str) -> Dict:
     """
     try:
         with get_session(engine) as session:
-            user = (
-                session.query(udahub.User)
-                .filter_by(external_user_id=external_user_id)
-                .first()
-            )
+            user = _user_by_external_id(session, external_user_id)
             if not user:
                 return {"error": f"No user found with external_user_id: {external_user_id}"}
 
-            prefs = user.preferences
+            prefs = session.get(udahub.UserPreferences, user.user_id)
             return {
                 "external_user_id": external_user_id,
                 "user_name": user.user_name,
@@ -309,11 +544,11 @@ def get_user_preferences(external_user_id: str) -> Dict:
                 "notes": prefs.notes if prefs else None,
             }
     except Exception as e:
-        logger.error(f"Error retrieving preferences for '{external_user_id}': {e}")
+        logger.error("Error retrieving preferences for '%s': %s", external_user_id, e)
         return {"error": "An error occurred while retrieving user preferences."}
 
 
-@mcp.tool()
+@mcp_tool()
 def update_user_preferences(
     external_user_id: str,
     preferred_language: str = "",
@@ -346,19 +581,11 @@ def update_user_preferences(
     """
     try:
         with get_session(engine) as session:
-            user = (
-                session.query(udahub.User)
-                .filter_by(external_user_id=external_user_id)
-                .first()
-            )
+            user = _user_by_external_id(session, external_user_id)
             if not user:
                 return {"error": f"No user found with external_user_id: {external_user_id}"}
 
-            prefs = (
-                session.query(udahub.UserPreferences)
-                .filter_by(user_id=user.user_id)
-                .first()
-            )
+            prefs = session.get(udahub.UserPreferences, user.user_id)
             if not prefs:
                 prefs = udahub.UserPreferences(user_id=user.user_id)
                 session.add(prefs)
@@ -371,7 +598,7 @@ def update_user_preferences(
                 existing = prefs.notes or ""
                 prefs.notes = (existing + "\n" + notes).strip()
 
-            logger.info(f"Updated preferences for external_user_id='{external_user_id}'")
+            logger.info("Updated preferences for external_user_id='%s'", external_user_id)
             return {
                 "external_user_id": external_user_id,
                 "preferred_language": prefs.preferred_language,
@@ -379,5 +606,5 @@ def update_user_preferences(
                 "notes": prefs.notes,
             }
     except Exception as e:
-        logger.error(f"Error updating preferences for '{external_user_id}': {e}")
+        logger.error("Error updating preferences for '%s': %s", external_user_id, e)
         return {"error": "An error occurred while updating user preferences."}
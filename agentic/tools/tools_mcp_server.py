@@ -1,16 +1,21 @@
 
+import asyncio
+import functools
 import os
 import sys
 import json
 import logging
 from pathlib import Path
+from typing import TYPE_CHECKING
 from mcp.server.fastmcp import FastMCP
-from langchain_openai import OpenAIEmbeddings
-from langchain_chroma import Chroma
-from langchain_core.documents import Document
 
 from dotenv import load_dotenv
 
+if TYPE_CHECKING:
+    from langchain_chroma import Chroma
+
+# The one sys.path bootstrap: lets the server run as a script. The tool modules are only
+# ever imported as agentic.tools.*, so the workspace root is already importable for them.
 workspace_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
 if workspace_root not in sys.path:
     sys.path.insert(0, workspace_root)
@@ -19,10 +24,121 @@ from settings import settings
 
 mcp = FastMCP("CultPass Tools", "Tools for managing CultPass users and experiences.")
 
-# Import tool modules AFTER mcp is defined so @mcp.tool() decorators register correctly
-import agentic.tools.cultpass_tools
-import agentic.tools.knowledge_tools
-import agentic.tools.ticket_tools
+
+def mcp_tool(**kwargs):
+    """
+    Register a synchronous tool with ``mcp`` and return the function unchanged.
+
+    FastMCP would call a plain function on the server's event loop, so one slow
+    SQLite or Chroma call would stall every other request. The registered handler
+    runs it in a worker thread instead; in-process callers keep the sync function.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def handler(*args, **kw):
+            return await asyncio.to_thread(fn, *args, **kw)
+
+        mcp.tool(**kwargs)(handler)
+        return fn
+
+    return decorator
+
+# HNSW index settings for newly created collections. OpenAI embeddings are unit length,
+# so cosine distance ranks exactly like the inner product.
+CHROMA_COLLECTION_METADATA = {
+    "hnsw:space": "cosine",
+    "hnsw:construction_ef": 200,
+    "hnsw:M": 32,
+    "hnsw:search_ef": 64,
+}
+
+EMBEDDING_BATCH_SIZE = 256
+
+
+def open_vector_store(collection_name: str, persist_directory: str, embeddings) -> "Chroma":
+    """
+    Open a persisted Chroma collection, creating it with ``CHROMA_COLLECTION_METADATA``.
+
+    Chroma fixes a collection's distance metric when the collection is created, so every
+    opener (the search tools as well as ``populate_vector_store``) goes through here; the
+    first one to run must not create an l2 index.
+    """
+    from langchain_chroma import Chroma
+
+    return Chroma(
+        collection_name=collection_name,
+        embedding_function=embeddings,
+        collection_metadata=CHROMA_COLLECTION_METADATA,
+        persist_directory=persist_directory,
+    )
+
+
+def stored_record_count(collection_name: str, persist_directory: str) -> int:
+    """
+    Number of records in a persisted collection; 0 if the store or collection is missing.
+
+    Nothing is created on disk, so this is safe to call before the stores are populated.
+    """
+    if not os.path.isdir(persist_directory):
+        return 0
+
+    import chromadb
+
+    try:
+        collection = chromadb.PersistentClient(path=persist_directory).get_collection(collection_name)
+    except Exception:
+        return 0
+    return collection.count()
+
+
+def populate_vector_store(collection_name: str, json_path: str, persist_directory: str, embeddings) -> "Chroma":
+    """
+    Open (or create) a persisted Chroma collection and embed any JSONL records it is missing.
+
+    Records are streamed from ``json_path`` and added in batches of ``EMBEDDING_BATCH_SIZE``,
+    starting after the number of documents already stored, so an interrupted build resumes
+    where it stopped and a complete one costs only a count. Document ids are the record's
+    line position, which keeps a re-run from duplicating entries.
+    """
+    from langchain_core.documents import Document
+
+    store = open_vector_store(collection_name, persist_directory, embeddings)
+    existing = store._collection.count()
+
+    batch, ids, position = [], [], 0
+    with open(json_path, "r") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            if position >= existing:
+                record = json.loads(line)
+                batch.append(Document(page_content=json.dumps(record), metadata={"title": record.get("title")}))
+                ids.append(str(position))
+            position += 1
+
+            if len(batch) >= EMBEDDING_BATCH_SIZE:
+                store.add_documents(batch, ids=ids)
+                batch, ids = [], []
+
+    if batch:
+        store.add_documents(batch, ids=ids)
+
+    logging.info("Collection %s: %d stored, %d added.", collection_name, existing, max(position - existing, 0))
+    return store
+
+
+# When run as a script this module is __main__; alias it so the tool modules'
+# "from agentic.tools.tools_mcp_server import mcp" reuses this server instead of
+# importing a second copy (with its own empty FastMCP) and registering there.
+# Only the server needs every tool registered: a process importing one tool module
+# (which imports this module for mcp_tool) does not load the others with it.
+if __name__ == "__main__":
+    sys.modules.setdefault("agentic.tools.tools_mcp_server", sys.modules[__name__])
+
+    # Import tool modules AFTER mcp is defined so @mcp_tool() decorators register correctly
+    import agentic.tools.cultpass_tools
+    import agentic.tools.knowledge_tools
+    import agentic.tools.ticket_tools
 
 
 logging.basicConfig(
@@ -33,10 +149,10 @@ logging.basicConfig(
 
 if __name__ == "__main__":
 
-    load_dotenv()  # Load environment variables from .env file
-
     if not os.getenv("VOCAREUM_OPENAPI_KEY"):
-        load_dotenv(Path.home() / ".env")  # Try loading from .env.local if not found in .env
+        load_dotenv()  # Load environment variables from .env file
+        if not os.getenv("VOCAREUM_OPENAPI_KEY"):
+            load_dotenv(Path.home() / ".env")  # Try loading from .env.local if not found in .env
 
     if not os.getenv("VOCAREUM_OPENAPI_KEY"):
         raise ValueError("VOCAREUM_OPENAPI_KEY environment variable is not set. Please set it in .env or .env.local.")
@@ -48,38 +164,29 @@ if __name__ == "__main__":
     os.makedirs(knowledge_db_dir, exist_ok=True)
 
     # Initialize the embeddings
+    from langchain_openai import OpenAIEmbeddings
+
     embeddings = OpenAIEmbeddings(
         base_url="https://openai.vocareum.com/v1",
         api_key=os.getenv("VOCAREUM_OPENAPI_KEY")
     )
 
-    # Create the vector store out of the exist experiences
-    if not os.path.exists(settings.experience_chroma_db_path):
-        logging.info("Creating ChromaDB vector store for CultPass experiences...")
-
-        with open(settings.experiences_json_path, "r") as f:
-            experiences_data = [json.loads(line) for line in f if line.strip()]
-
-        experience_vector_store = Chroma.from_documents(
-            documents=[Document(page_content=json.dumps(exp), metadata={"title": exp.get("title")}) for exp in experiences_data],
-            collection_name="cultpass_experiences",
-            embedding=embeddings,
-            persist_directory=settings.experience_chroma_db_path
-        )
-
-    # Create the vector store out of the existing knowledge base articles
-    if not os.path.exists(settings.knowledge_chroma_db_path):
-        logging.info("Creating ChromaDB vector store for UdaHub knowledge base...")
-
-        # Load knowledge base from JSON file
-        with open(settings.knowledge_json_path, "r") as f:
-            knowledge_data = [json.loads(line) for line in f if line.strip()]
-
-        knowledge_vector_store = Chroma.from_documents(
-            documents=[Document(page_content=json.dumps(kb), metadata={"title": kb.get("title")}) for kb in knowledge_data],
-            collection_name="udahub_knowledge",
-            embedding=embeddings,
-            persist_directory=settings.knowledge_chroma_db_path
-        )
+    # Create (or finish) the vector store out of the existing experiences
+    logging.info("Checking ChromaDB vector store for CultPass experiences...")
+    populate_vector_store(
+        "cultpass_experiences",
+        settings.experiences_json_path,
+        settings.experience_chroma_db_path,
+        embeddings,
+    )
+
+    # Create (or finish) the vector store out of the existing knowledge base articles
+    logging.info("Checking ChromaDB vector store for UdaHub knowledge base...")
+    populate_vector_store(
+        "udahub_knowledge",
+        settings.knowledge_json_path,
+        settings.knowledge_chroma_db_path,
+        embeddings,
+    )
 
     mcp.run(transport="stdio")
\ No newline at end of file
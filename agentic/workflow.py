@@ -3,40 +3,40 @@ import os
 from dotenv import load_dotenv
 from pathlib import Path
 
-from langchain_openai import ChatOpenAI
 from langchain_core.messages import SystemMessage
-from langgraph.checkpoint.memory import MemorySaver
 from langgraph_supervisor import create_supervisor
 
-from agentic.agents.classifier import classifier_agent
-from agentic.agents.retriever import retriever_agent
+from agentic.agents._checkpointer import sqlite_checkpointer
+from agentic.agents._llm_binding import prompt_cache_key, with_prompt_cache_key
+from agentic.agents._llm_singleton import get_default_llm
+from agentic.agents.triage import triage_agent
 from agentic.agents.resolver import resolver_agent
 from agentic.agents.escalation import escalation_agent
+from settings import settings
 
 SUPERVISOR_PROMPT = """
     You are the **Supervisor** of UDA-Hub, a universal decision agent \
     for customer support.
 
-    You orchestrate four specialised agents to handle support tickets end-to-end:
+    You orchestrate three specialised agents to handle support tickets end-to-end:
 
-    1. classifier agent: Analyzes the customer message and ticket, determines issue type, \
-    urgency, and then tags the ticket.
+    1. triage agent: Runs the classifier and the retriever in parallel. The classifier \
+    determines issue type, urgency and sentiment and tags the ticket; the retriever searches \
+    the knowledge base (RAG) and evaluates — based on reading the retrieved article content — \
+    how well the KB can answer the issue. It returns a CLASSIFIED line and a RETRIEVAL_RESULT \
+    line with a confidence score.
 
-    2. retriever agent: Searches the knowledge base (RAG) and evaluates — based on reading \
-    the retrieved article content, It returns a confidence score indicating how well the KB can answer the issue.
-
-    3. resolver agent: Uses the retrieved KB articles (visible in the conversation context \
+    2. resolver agent: Uses the retrieved KB articles (visible in the conversation context \
     from the retriever's output) and CultPass databases to compose an accurate, helpful answer. \
     It returns "NEEDS_ESCALATION" if the issue cannot be resolved automatically.
 
-    4. escalation agent: Handles unresolvable cases: writes a structured escalation note \
+    3. escalation agent: Handles unresolvable cases: writes a structured escalation note \
     for the human support lead and sends the customer a reassuring hand-off message.
 
     ### Routing rules (follow STRICTLY):
-    - ALWAYS start with classifier agent for NEW incoming messages.
-    - After classification, ALWAYS route to retriever agent.
-    - After retriever agent responds, determine the urgency from the classifier agent's output, then apply
-    the appropriate confidence threshold to the RETRIEVAL_RESULT:
+    - ALWAYS start with triage agent for NEW incoming messages.
+    - After triage agent responds, read the urgency from its CLASSIFIED line, then apply
+    the appropriate confidence threshold to its RETRIEVAL_RESULT:
 
     **High-urgency tickets** (urgency = high):
         * confidence >= 0.75  →  route to resolver agent.
@@ -48,30 +48,30 @@ SUPERVISOR_PROMPT = """
 
     - If resolver returns "NEEDS_ESCALATION" or signals it cannot resolve, route to escalation agent.
     - If resolver successfully answers, return the resolver's final answer directly.
-    - For follow-up messages in the same conversation, skip classifier agent unless the topic changes.
+    - For follow-up messages in the same conversation, skip triage agent unless the topic changes.
 
     Be decisive. Do not ask the user clarifying questions — delegate to the right agent.
 """
 
 # Load the environment variables from .env file
-load_dotenv()
 if not os.getenv("VOCAREUM_OPENAPI_KEY"):
-    load_dotenv(Path.home() / ".env")
+    load_dotenv()
+    if not os.getenv("VOCAREUM_OPENAPI_KEY"):
+        load_dotenv(Path.home() / ".env")
+
+# Shared LLM model (vocareum base URL, pooled keep-alive HTTP client)
+llm_model = get_default_llm()
 
-# Setup the LLM model with the appropriate API key and base URL
-llm_model = ChatOpenAI(
-        model="gpt-4o-mini",
-        base_url="https://openai.vocareum.com/v1",
-        api_key=os.getenv("VOCAREUM_OPENAPI_KEY"),
-        temperature=0
-    )
+# SUPERVISOR_PROMPT is static and always the first message, so every routing step shares
+# its prefix; the cache key keeps those requests on the same OpenAI prompt cache.
+supervisor_model = with_prompt_cache_key(llm_model, prompt_cache_key("supervisor", SUPERVISOR_PROMPT))
 
-# Create a supervisor agent that orchestrates the classifier, retriever, resolver, and escalation agents
+# Create a supervisor agent that orchestrates the triage (classifier + retriever), resolver, and escalation agents
 supervisor_graph = create_supervisor(
-    agents=[classifier_agent, retriever_agent, resolver_agent, escalation_agent],
-    model=llm_model,
+    agents=[triage_agent, resolver_agent, escalation_agent],
+    model=supervisor_model,
     prompt=SUPERVISOR_PROMPT,
     output_mode="last_message",
 )
 
-orchestrator = supervisor_graph.compile(checkpointer=MemorySaver())
+orchestrator = supervisor_graph.compile(checkpointer=sqlite_checkpointer(settings.checkpoint_db_path))
@@ -6,6 +6,7 @@ from sqlalchemy import (
     DateTime,
     Enum,
     ForeignKey,
+    Index,
     UniqueConstraint
 )
 from sqlalchemy.ext.declarative import declarative_base
@@ -85,6 +86,11 @@ class Ticket(Base):
     channel = Column(String)
     created_at = Column(DateTime, default=func.now())
 
+    # Serves a customer's most-recent-first ticket history as an index range scan.
+    __table_args__ = (
+        Index('ix_ticket_user_created', 'user_id', created_at.desc()),
+    )
+
     account = relationship("Account", back_populates="tickets")
     user = relationship("User", back_populates="tickets")
     ticket_metadata = relationship("TicketMetadata", uselist=False, back_populates="ticket")
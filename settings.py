@@ -1,26 +1,62 @@
 
 
 import os
-from dataclasses import dataclass
+from functools import cached_property
+
+# Parent path of the project (assumes this file is in the root); __file__ is already
+# absolute when imported, so abspath (and its getcwd) is only needed for a relative one.
+PARENT_DIR = os.path.dirname(__file__ if os.path.isabs(__file__) else os.path.abspath(__file__))
+
+# The paths below are fixed project locations, so they are formatted directly with
+# os.sep instead of going through os.path.join.
+_SEP = os.sep
+EXTERNAL_DATA_DIR = f"{PARENT_DIR}{_SEP}data{_SEP}external"
+CORE_DATA_DIR = f"{PARENT_DIR}{_SEP}data{_SEP}core"
+
+# Database paths
+CULTPASS_DB_PATH = f"{EXTERNAL_DATA_DIR}{_SEP}cultpass.db"
+UDAHUB_DB_PATH = f"{CORE_DATA_DIR}{_SEP}udahub.db"
+
+# LangGraph checkpoints (per-thread agent state)
+CHECKPOINT_DB_PATH = f"{CORE_DATA_DIR}{_SEP}checkpoints.db"
+
+# Raise on any lazy relationship load in the ticket queries (set DEBUG_RAISELOAD=1 in dev/tests)
+DEBUG_RAISELOAD = os.getenv("DEBUG_RAISELOAD", "0") == "1"
+
 
-@dataclass
 class Settings:
-    """Settings for the application."""
+    """
+    Settings for the application.
 
-    # Parent path of the project (assumes this file is in the root)
-    parent_dir = os.path.dirname(os.path.abspath(__file__))
+    The database paths every entry point needs are plain attributes set once. The Chroma
+    and JSONL corpus paths, used only by the search tools and vector-store population,
+    are built on first access and then cached on the instance.
+    """
 
-    # Database paths
-    cultpass_db_path = os.path.join(parent_dir, "data", "external", "cultpass.db")
-    udahub_db_path = os.path.join(parent_dir, "data", "core", "udahub.db")
+    def __init__(self):
+        self.parent_dir = PARENT_DIR
+        self.cultpass_db_path = CULTPASS_DB_PATH
+        self.udahub_db_path = UDAHUB_DB_PATH
+        self.checkpoint_db_path = CHECKPOINT_DB_PATH
+        self.debug_raiseload = DEBUG_RAISELOAD
 
     # Chroma DB settings directories
-    experience_chroma_db_path = os.path.join(parent_dir, "data", "external", "chroma_experiences", "exp.sqlite3")
-    knowledge_chroma_db_path = os.path.join(parent_dir, "data", "core", "chroma_knowledge", "kb.sqlite3")
+    @cached_property
+    def experience_chroma_db_path(self) -> str:
+        return f"{EXTERNAL_DATA_DIR}{_SEP}chroma_experiences{_SEP}exp.sqlite3"
+
+    @cached_property
+    def knowledge_chroma_db_path(self) -> str:
+        return f"{CORE_DATA_DIR}{_SEP}chroma_knowledge{_SEP}kb.sqlite3"
 
     # Json file paths for experiences and knowledge base (used for initial vector store population)
-    experiences_json_path = os.path.join(parent_dir, "data", "external", "cultpass_experiences.jsonl")
-    knowledge_json_path = os.path.join(parent_dir, "data", "external", "cultpass_articles.jsonl")
+    @cached_property
+    def experiences_json_path(self) -> str:
+        return f"{EXTERNAL_DATA_DIR}{_SEP}cultpass_experiences.jsonl"
+
+    @cached_property
+    def knowledge_json_path(self) -> str:
+        return f"{EXTERNAL_DATA_DIR}{_SEP}cultpass_articles.jsonl"
 
 
-settings = Settings()
\ No newline at end of file
+settings = Settings()
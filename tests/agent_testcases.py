@@ -6,22 +6,26 @@ inputs and printing the key fields from the returned state.
 
 Run from the project root:
     python -m pytest tests/agent_testcases.py
+    python main.py smoke
 """
 
+import asyncio
+import hashlib
+import importlib
 import json
 import logging
 import os
-import uuid
+import shelve
+import sys
 from pathlib import Path
+from typing import Callable, Optional
 
 from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage
 from langgraph.errors import GraphRecursionError
-from sqlalchemy import create_engine
 
-from utils import get_session
-from data.models import udahub
+from agentic.agents._llm_singleton import get_default_llm
+from main import seed_test_tickets
 
 # ---------------------------------------------------------------------------
 # Logging
@@ -37,27 +41,25 @@ logger = logging.getLogger("agent_testcases")
 # Environment & LLM
 # ---------------------------------------------------------------------------
 
-load_dotenv()
 if not os.getenv("VOCAREUM_OPENAPI_KEY"):
-    load_dotenv(Path.home() / ".env")
+    load_dotenv()
+    if not os.getenv("VOCAREUM_OPENAPI_KEY"):
+        load_dotenv(Path.home() / ".env")
 
-_llm = ChatOpenAI(
-    model="gpt-4o-mini",
-    base_url="https://openai.vocareum.com/v1",
-    api_key=os.getenv("VOCAREUM_OPENAPI_KEY"),
-    temperature=0,
-)
+# The shared model and its pooled keep-alive HTTP client, threaded through every agent call.
+_llm = get_default_llm()
 
 
 _CONFIG = {"configurable": {"llm": _llm}, "recursion_limit": 20}
 
+# Opt-in on-disk cache of agent responses (``python main.py smoke --cached``).
+RESPONSE_CACHE_PATH = ".agent_cache/smoke"
+_response_cache: Optional[shelve.Shelf] = None
+
 # ---------------------------------------------------------------------------
 # DB seeding — dummy tickets used by the smoke tests
 # ---------------------------------------------------------------------------
 
-_DB_PATH = "data/core/udahub.db"
-_ACCOUNT_ID = "cultpass"
-
 _TEST_TICKETS = [
     {
         "ticket_id": "T-001",
@@ -95,58 +97,6 @@ _TEST_TICKETS = [
 ]
 
 
-def seed_test_tickets() -> None:
-    """Insert T-001, T-002, T-003 into the DB if they don't already exist."""
-    if not Path(_DB_PATH).exists():
-        logger.warning("DB not found at %s — skipping ticket seeding.", _DB_PATH)
-        return
-
-    engine = create_engine(f"sqlite:///{_DB_PATH}", echo=False)
-
-    with get_session(engine) as session:
-        for t in _TEST_TICKETS:
-            # Upsert the user
-            user = session.query(udahub.User).filter_by(
-                account_id=_ACCOUNT_ID,
-                external_user_id=t["external_user_id"],
-            ).first()
-
-            if not user:
-                user = udahub.User(
-                    user_id=str(uuid.uuid4()),
-                    account_id=_ACCOUNT_ID,
-                    external_user_id=t["external_user_id"],
-                    user_name=t["user_name"],
-                )
-                session.add(user)
-                session.flush()
-
-            # Skip if ticket already exists
-            if session.query(udahub.Ticket).filter_by(ticket_id=t["ticket_id"]).first():
-                logger.debug("Ticket %s already exists — skipping.", t["ticket_id"])
-                continue
-
-            ticket = udahub.Ticket(
-                ticket_id=t["ticket_id"],
-                account_id=_ACCOUNT_ID,
-                user_id=user.user_id,
-                channel=t["channel"],
-            )
-            metadata = udahub.TicketMetadata(
-                ticket_id=t["ticket_id"],
-                status=t["status"],
-                main_issue_type=t["issue_type"],
-                tags=t["tags"],
-            )
-            message = udahub.TicketMessage(
-                message_id=str(uuid.uuid4()),
-                ticket_id=t["ticket_id"],
-                role=udahub.RoleEnum.user,
-                content=t["content"],
-            )
-            session.add_all([ticket, metadata, message])
-            logger.info("Seeded ticket %s for %s.", t["ticket_id"], t["user_name"])
-
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
@@ -158,214 +108,248 @@ def _section(title: str) -> None:
 
 
 def _print_messages(messages: list) -> None:
+    # Collected and written once: a transcript can run to dozens of lines.
+    lines = []
     for i, msg in enumerate(messages):
         role = type(msg).__name__
         content = getattr(msg, "content", "")
         tool_calls = getattr(msg, "tool_calls", [])
-        print(f"  [{i}] {role}: {content[:200]!r}")
+        lines.append(f"  [{i}] {role}: {content[:200]!r}")
         if tool_calls:
             for tc in tool_calls:
-                print(f"       tool_call → {tc['name']}({json.dumps(tc.get('args', {}), default=str)[:120]})")
+                lines.append(f"       tool_call → {tc['name']}({json.dumps(tc.get('args', {}), default=str)[:120]})")
+    if lines:
+        sys.stdout.write("\n".join(lines) + "\n")
 
 
-# ---------------------------------------------------------------------------
-# Test scenarios
-# ---------------------------------------------------------------------------
+def _cache_key(name: str, state: dict) -> str:
+    # Only role and content identify a scenario; message ids are assigned per run.
+    payload = json.dumps({"agent": name, "messages": [[m.type, m.content] for m in state["messages"]]})
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
 
-# Each scenario is (label, agent_name_for_logging, agent, input_state, extra_check_fn)
-# extra_check_fn receives the final state dict and prints important fields.
 
-def run_classifier() -> None:
-    from agentic.agents.classifier import classifier_agent
+async def _invoke_all(agent, name: str, states: list) -> list:
+    """
+    Invoke ``agent`` on every state concurrently; failures come back as exception objects.
 
-    scenarios = [
-        (
-            "Subscription downgrade enquiry (low urgency, neutral)",
-            {"messages": [HumanMessage(content="Hi, I want to downgrade my CultPass plan from Premium to Basic.")]},
-        ),
-        (
-            "Payment failure (high urgency, frustrated)",
-            {"messages": [HumanMessage(content="I was charged twice for my subscription this month! This is ridiculous!")]},
-        ),
-        (
-            "Login problem (medium urgency, negative)",
-            {"messages": [HumanMessage(content="I cannot log in. I keep getting 'invalid credentials' even after resetting my password.")]},
-        ),
-    ]
+    With the response cache open, scenarios answered by an earlier run are served from
+    disk and only the rest reach the model. Failures are never cached.
+    """
+    cache = _response_cache if _response_cache is not None else {}
+    keys = [_cache_key(name, state) for state in states]
+    results = {key: cache[key] for key in keys if key in cache}
 
-    _section("CLASSIFIER AGENT")
-    for label, state in scenarios:
-        print(f"\n--- Scenario: {label} ---")
-        try:
-            result = classifier_agent.invoke(state, config=_CONFIG)
-        except GraphRecursionError as exc:
-            print(f"  [!] GraphRecursionError: {exc}")
-            continue
-        except Exception as exc:
-            print(f"  [!] Unexpected error: {exc}")
-            continue
+    pending = [(key, state) for key, state in zip(keys, states) if key not in results]
+    fresh = await asyncio.gather(
+        *(agent.ainvoke(state, config=_CONFIG) for _, state in pending),
+        return_exceptions=True,
+    )
 
-        # Messages
-        _print_messages(result.get("messages", []))
-
-        # Structured classification output
-        clf = result.get("classification")
-        if clf:
-            print(f"  classification.issue_type : {clf.issue_type}")
-            print(f"  classification.urgency    : {clf.urgency}")
-            print(f"  classification.sentiment  : {clf.sentiment}")
-            print(f"  classification.summary    : {clf.summary}")
-        else:
-            print("  [!] classification field is None — structured output was not populated")
+    for (key, _), result in zip(pending, fresh):
+        results[key] = result
+        if not isinstance(result, BaseException):
+            try:
+                cache[key] = result
+            except Exception as exc:
+                logger.debug("Could not cache %s response: %s", name, exc)
 
+    return [results[key] for key in keys]
 
-def run_retriever() -> None:
-    from agentic.agents.retriever import retriever_agent
-
-    scenarios = [
-        (
-            "Subscription cancellation query",
-            {"messages": [HumanMessage(content="How do I cancel my CultPass subscription?")]},
-        ),
-        (
-            "Obscure/unlikely topic (expect low confidence)",
-            {"messages": [HumanMessage(content="Can I use my CultPass points to buy hardware?")]},
-        ),
-    ]
+# ---------------------------------------------------------------------------
+# Test scenarios
+# ---------------------------------------------------------------------------
 
-    _section("RETRIEVER AGENT")
-    for label, state in scenarios:
-        print(f"\n--- Scenario: {label} ---")
-        try:
-            result = retriever_agent.invoke(state, config=_CONFIG)
-        except GraphRecursionError as exc:
-            print(f"  [!] GraphRecursionError: {exc}")
-            continue
-        except Exception as exc:
-            print(f"  [!] Unexpected error: {exc}")
-            continue
+# Each scenario is (label, input_state); each inspect function receives the final state
+# dict of one scenario and prints its important fields.
+
+CLASSIFIER_SCENARIOS = [
+    (
+        "Subscription downgrade enquiry (low urgency, neutral)",
+        {"messages": [HumanMessage(content="Hi, I want to downgrade my CultPass plan from Premium to Basic.")]},
+    ),
+    (
+        "Payment failure (high urgency, frustrated)",
+        {"messages": [HumanMessage(content="I was charged twice for my subscription this month! This is ridiculous!")]},
+    ),
+    (
+        "Login problem (medium urgency, negative)",
+        {"messages": [HumanMessage(content="I cannot log in. I keep getting 'invalid credentials' even after resetting my password.")]},
+    ),
+]
 
-        _print_messages(result.get("messages", []))
+RETRIEVER_SCENARIOS = [
+    (
+        "Subscription cancellation query",
+        {"messages": [HumanMessage(content="How do I cancel my CultPass subscription?")]},
+    ),
+    (
+        "Obscure/unlikely topic (expect low confidence)",
+        {"messages": [HumanMessage(content="Can I use my CultPass points to buy hardware?")]},
+    ),
+]
 
-        confidence = result.get("confidence")
-        articles = result.get("retrieved_articles") or []
-        print(f"  confidence        : {confidence}")
-        print(f"  articles_found    : {len(articles)}")
-        for a in articles:
-            print(f"    • {a.title!r} — {a.relevance[:100]}")
-
-        if confidence is None:
-            print("  [!] confidence field is None — structured output was not populated")
-
-
-def run_resolver() -> None:
-    from agentic.agents.resolver import resolver_agent
-
-    scenarios = [
-        (
-            "Resolvable: subscription pause question",
-            {
-                "messages": [
-                    HumanMessage(
-                        content=(
-                            "Ticket #T-001. Customer asks: Can I pause my CultPass subscription "
-                            "for two months while I travel? "
-                            "[Retriever context: KB article 'Subscription Pause Policy' found, "
-                            "confidence=0.85]"
-                        )
+RESOLVER_SCENARIOS = [
+    (
+        "Resolvable: subscription pause question",
+        {
+            "messages": [
+                HumanMessage(
+                    content=(
+                        "Ticket #T-001. Customer asks: Can I pause my CultPass subscription "
+                        "for two months while I travel? "
+                        "[Retriever context: KB article 'Subscription Pause Policy' found, "
+                        "confidence=0.85]"
                     )
-                ]
-            },
-        ),
-        (
-            "Needs escalation: double-charge refund request",
-            {
-                "messages": [
-                    HumanMessage(
-                        content=(
-                            "Ticket #T-002. Customer asks: I was charged twice in March. "
-                            "I need a refund immediately. "
-                            "[Retriever context: no KB article directly covers manual refunds, "
-                            "confidence=0.32]"
-                        )
+                )
+            ]
+        },
+    ),
+    (
+        "Needs escalation: double-charge refund request",
+        {
+            "messages": [
+                HumanMessage(
+                    content=(
+                        "Ticket #T-002. Customer asks: I was charged twice in March. "
+                        "I need a refund immediately. "
+                        "[Retriever context: no KB article directly covers manual refunds, "
+                        "confidence=0.32]"
                     )
-                ]
-            },
-        ),
-    ]
+                )
+            ]
+        },
+    ),
+]
 
-    _section("RESOLVER AGENT")
-    for label, state in scenarios:
-        print(f"\n--- Scenario: {label} ---")
-        try:
-            result = resolver_agent.invoke(state, config=_CONFIG)
-        except GraphRecursionError as exc:
-            print(f"  [!] GraphRecursionError (ticket not found in DB — expected for synthetic IDs): {exc}")
-            continue
-        except Exception as exc:
-            print(f"  [!] Unexpected error: {exc}")
-            continue
+ESCALATION_SCENARIOS = [
+    (
+        "High-urgency escalation: blocked account",
+        {
+            "messages": [
+                HumanMessage(
+                    content=(
+                        "Ticket #T-003, urgency=high. Customer reports their account was "
+                        "blocked without notice and they cannot access any booked experiences. "
+                        "Resolver could not unblock automatically."
+                    )
+                )
+            ]
+        },
+    ),
+]
 
-        _print_messages(result.get("messages", []))
 
-        last_content = result["messages"][-1].content if result.get("messages") else ""
-        if "NEEDS_ESCALATION" in last_content:
-            print("  ✓ NEEDS_ESCALATION signal emitted correctly")
-        else:
-            print("  ✓ Resolver produced a response (no escalation)")
-
-
-def run_escalation() -> None:
-    from agentic.agents.escalation import escalation_agent
-
-    scenarios = [
-        (
-            "High-urgency escalation: blocked account",
-            {
-                "messages": [
-                    HumanMessage(
-                        content=(
-                            "Ticket #T-003, urgency=high. Customer reports their account was "
-                            "blocked without notice and they cannot access any booked experiences. "
-                            "Resolver could not unblock automatically."
-                        )
-                    )
-                ]
-            },
-        ),
-    ]
+def _inspect_classifier(result: dict) -> None:
+    # Structured classification output
+    clf = result.get("classification")
+    if clf:
+        print(f"  classification.issue_type : {clf.issue_type}")
+        print(f"  classification.urgency    : {clf.urgency}")
+        print(f"  classification.sentiment  : {clf.sentiment}")
+        print(f"  classification.summary    : {clf.summary}")
+    else:
+        print("  [!] classification field is None — structured output was not populated")
+
+
+def _inspect_retriever(result: dict) -> None:
+    confidence = result.get("confidence")
+    articles = result.get("retrieved_articles") or []
+    print(f"  confidence        : {confidence}")
+    print(f"  articles_found    : {len(articles)}")
+    for a in articles:
+        print(f"    • {a.title!r} — {a.relevance[:100]}")
+
+    if confidence is None:
+        print("  [!] confidence field is None — structured output was not populated")
+
+
+def _inspect_resolver(result: dict) -> None:
+    last_content = result["messages"][-1].content if result.get("messages") else ""
+    if "NEEDS_ESCALATION" in last_content:
+        print("  ✓ NEEDS_ESCALATION signal emitted correctly")
+    else:
+        print("  ✓ Resolver produced a response (no escalation)")
+
+
+def _inspect_escalation(result: dict) -> None:
+    last = result["messages"][-1] if result.get("messages") else None
+    if last:
+        print(f"\n  Final agent message:\n  {last.content[:500]}")
+
+
+# (name, module, graph attribute, scenarios, inspect_fn, note printed with a GraphRecursionError)
+AGENTS = [
+    ("classifier", "agentic.agents.classifier", "classifier_agent",
+     CLASSIFIER_SCENARIOS, _inspect_classifier, ""),
+    ("retriever", "agentic.agents.retriever", "retriever_agent",
+     RETRIEVER_SCENARIOS, _inspect_retriever, ""),
+    ("resolver", "agentic.agents.resolver", "resolver_agent",
+     RESOLVER_SCENARIOS, _inspect_resolver, " (ticket not found in DB — expected for synthetic IDs)"),
+    ("escalation", "agentic.agents.escalation", "escalation_agent",
+     ESCALATION_SCENARIOS, _inspect_escalation, " (LLM retried tools after DB misses)"),
+]
+
 
-    _section("ESCALATION AGENT")
-    for label, state in scenarios:
+async def run_agent(
+    name: str,
+    module: str,
+    attr: str,
+    scenarios: list,
+    inspect_fn: Callable[[dict], None],
+    recursion_note: str = "",
+) -> None:
+    """Run every scenario of one agent concurrently and print each result in order."""
+    # Imported on first use, so a section only loads the agent it exercises.
+    agent = getattr(importlib.import_module(module), attr)
+
+    _section(f"{name.upper()} AGENT")
+    results = await _invoke_all(agent, name, [state for _, state in scenarios])
+    for (label, _), result in zip(scenarios, results):
         print(f"\n--- Scenario: {label} ---")
-        try:
-            result = escalation_agent.invoke(state, config=_CONFIG)
-        except GraphRecursionError as exc:
-            print(f"  [!] GraphRecursionError (LLM retried tools after DB misses): {exc}")
+        if isinstance(result, GraphRecursionError):
+            print(f"  [!] GraphRecursionError{recursion_note}: {result}")
             continue
-        except Exception as exc:
-            print(f"  [!] Unexpected error: {exc}")
+        if isinstance(result, Exception):
+            print(f"  [!] Unexpected error: {result}")
             continue
 
         _print_messages(result.get("messages", []))
-
-        last = result["messages"][-1] if result.get("messages") else None
-        if last:
-            print(f"\n  Final agent message:\n  {last.content[:500]}")
+        inspect_fn(result)
 
 
 # ---------------------------------------------------------------------------
 # Entry point
 # ---------------------------------------------------------------------------
 
-if __name__ == "__main__":
+async def _run_sections() -> None:
+    # One event loop for every section, so the pooled HTTP connections stay warm between them.
+    for spec in AGENTS:
+        await run_agent(*spec)
+
+
+def run_smoke_tests(cached: bool = False) -> None:
+    """
+    Seed the smoke-test tickets, then exercise each agent graph in turn.
+
+    With ``cached=True`` responses are kept in ``RESPONSE_CACHE_PATH``, so repeat runs only
+    pay for scenarios whose input changed. Delete the cache after changing an agent.
+    """
+    global _response_cache
+
     logger.info("Starting agent smoke tests")
 
-    seed_test_tickets()
+    seed_test_tickets(_TEST_TICKETS)
 
-    run_classifier()
-    run_retriever()
-    run_resolver()
-    run_escalation()
+    if not cached:
+        asyncio.run(_run_sections())
+    else:
+        os.makedirs(os.path.dirname(RESPONSE_CACHE_PATH), exist_ok=True)
+        with shelve.open(RESPONSE_CACHE_PATH) as _response_cache:
+            asyncio.run(_run_sections())
+        _response_cache = None
 
     logger.info("All smoke tests complete")
+
+
+if __name__ == "__main__":
+    run_smoke_tests()
@@ -0,0 +1,86 @@
+import os
+import sys
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+# The one place the tests put the project root on sys.path. pytest passes conftest an
+# absolute __file__, so no abspath is needed.
+workspace_root = os.path.dirname(os.path.dirname(__file__))
+if workspace_root not in sys.path:
+    sys.path.insert(0, workspace_root)
+
+from data.models import udahub
+import agentic.tools.ticket_tools as tt
+
+
+# ---------------------------------------------------------------------------
+# Fixtures
+# ---------------------------------------------------------------------------
+
+@pytest.fixture(scope="session")
+def engine():
+    """
+    One in-memory UdaHub database for the whole run; the schema is created once.
+
+    Under pytest-xdist every worker process builds its own, so workers never share state.
+
+    StaticPool keeps the single connection (and with it the database) alive between
+    checkouts, so no test touches the filesystem.
+    """
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+
+    @event.listens_for(engine, "connect")
+    def _enforce_foreign_keys(dbapi_connection, connection_record):
+        # Same constraint checking as the application's engine (utils.get_engine).
+        dbapi_connection.execute("PRAGMA foreign_keys=ON")
+
+    # The database is always new, so skip create_all's per-table existence checks.
+    udahub.Base.metadata.create_all(engine, checkfirst=False)
+    return engine
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _patch_engine(engine):
+    """Point the ticket tools at the test database for the whole run, never at data/core."""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(tt, "engine", engine)
+        yield
+
+
+@pytest.fixture
+def db_connection(engine):
+    """
+    A connection inside a transaction and SAVEPOINT, rolled back after the test.
+
+    The ticket tools are bound to this connection for the test, so the sessions they
+    open join the transaction and their commits only release nested savepoints.
+    Nothing a test writes reaches the next one.
+    """
+    conn = engine.connect()
+    trans = conn.begin()
+    conn.begin_nested()
+    tt.engine = conn
+    try:
+        yield conn
+    finally:
+        tt.engine = engine
+        trans.rollback()
+        conn.close()
+        # Cached reads are keyed by the (now discarded) connection object.
+        tt._read_cache.clear()
+
+
+@pytest.fixture
+def db_session(db_connection):
+    """An ORM session on the test's connection; flush to make rows visible to the tools."""
+    session = Session(bind=db_connection, expire_on_commit=False)
+    try:
+        yield session
+    finally:
+        session.close()
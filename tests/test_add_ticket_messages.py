@@ -0,0 +1,60 @@
+import uuid
+from sqlalchemy import event
+
+from data.models import udahub
+import agentic.tools.ticket_tools as tt
+
+
+# ---------------------------------------------------------------------------
+# Test
+# ---------------------------------------------------------------------------
+
+def test_add_ticket_messages(db_session, db_connection):
+    """
+    Seed the shared test database with one ticket and confirm add_ticket_messages appends
+    all messages in order with a single INSERT statement.
+    """
+    ticket_id = str(uuid.uuid4())
+
+    account_id = str(uuid.uuid4())
+    user_id    = str(uuid.uuid4())
+
+    db_session.add_all([
+        udahub.Account(account_id=account_id, account_name="Test Account"),
+        udahub.User(user_id=user_id, account_id=account_id,
+                    external_user_id="ext-001", user_name="alice"),
+        udahub.Ticket(ticket_id=ticket_id, account_id=account_id,
+                      user_id=user_id, channel="chat"),
+    ])
+    db_session.flush()
+
+    inserts = []
+
+    @event.listens_for(db_connection, "before_cursor_execute")
+    def _count(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("INSERT"):
+            inserts.append(statement)
+
+    # --- call the tool ---
+    result = tt.add_ticket_messages(ticket_id, [
+        {"role": "user", "content": "My QR code is not working."},
+        {"role": "System", "content": "Customer is on the premium plan."},
+        {"role": "robot", "content": "Let me check that for you."},
+    ])
+
+    # --- assertions ---
+    assert len(inserts) == 1
+    assert result.get("roles") == ["user", "system", "agent"]
+    assert len(result.get("message_ids", [])) == 3
+
+    single = tt.add_ticket_message(ticket_id, "Anything else?")
+    assert single.get("role") == "agent"
+    assert single.get("message_id")
+
+    info = tt.get_ticket_info(ticket_id)
+    assert [m["content"] for m in info.get("messages")] == [
+        "My QR code is not working.",
+        "Customer is on the premium plan.",
+        "Let me check that for you.",
+        "Anything else?",
+    ]
@@ -0,0 +1,48 @@
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+
+from agentic.agents._context import trim_history, with_context
+
+
+def test_trim_keeps_tool_call_with_its_results():
+    """A window that would start on a ToolMessage is widened back to the calling AIMessage."""
+    call = AIMessage(content="", tool_calls=[
+        {"name": "search", "args": {}, "id": "a"},
+        {"name": "search", "args": {}, "id": "b"},
+    ])
+    messages = [
+        HumanMessage(content="original issue"),
+        *[AIMessage(content=f"filler {i}") for i in range(5)],
+        call,
+        ToolMessage(content="r1", tool_call_id="a"),
+        ToolMessage(content="r2", tool_call_id="b"),
+        AIMessage(content="done"),
+    ]
+
+    trimmed = trim_history(messages, keep=2)
+
+    assert trimmed[0].content == "original issue"
+    assert trimmed[1] is call
+    assert [m.content for m in trimmed[2:]] == ["r1", "r2", "done"]
+
+
+def test_short_history_is_untouched():
+    messages = [HumanMessage(content="hi"), AIMessage(content="hello")]
+    assert trim_history(messages, keep=20) is messages
+
+
+def test_with_context_orders_blocks():
+    """Static prompt first, then TICKET CONTEXT, then USER CONTEXT, then the conversation."""
+    system = SystemMessage(content="prompt")
+    state = {
+        "messages": [HumanMessage(content="hi")],
+        "ticket_context": '{"ticket_id": "T-1"}',
+        "user_context": '{"history": []}',
+    }
+
+    built = with_context(system, state)
+
+    assert built[0] is system
+    assert built[1].content.startswith("TICKET CONTEXT:")
+    assert built[2].content.startswith("USER CONTEXT:")
+    assert built[3].content == "hi"
@@ -0,0 +1,26 @@
+
+from agentic.agents._fast_router import FAST_CONFIDENCE, is_trivial, match_article
+
+
+def test_unambiguous_keywords_match_an_article():
+    """Two tag keywords of the login article route straight to it."""
+    result = match_article("I forgot my password and cannot login")
+
+    assert result is not None
+    assert result["confidence"] == FAST_CONFIDENCE
+    assert result["retrieved_articles"][0]["title"] == "How to Handle Login Issues"
+
+
+def test_single_or_tied_keywords_fall_through():
+    """A lone keyword, or a tie between articles, is left to the LLM."""
+    assert match_article("How do I cancel my subscription?") is None
+    assert match_article("hello there") is None
+
+
+def test_trivial_messages_are_detected():
+    """Greetings, thanks and bare ticket ids skip retrieval; short real questions do not."""
+    assert is_trivial("Hi there!")
+    assert is_trivial("thank you.")
+    assert is_trivial("3f2b6c1e-8a4d-4e2f-9b1a-0c5d7e9f1a2b")
+    assert not is_trivial("refund?")
+    assert not is_trivial("hi, I cannot log in")
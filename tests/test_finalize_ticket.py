@@ -0,0 +1,46 @@
+import uuid
+
+from data.models import udahub
+import agentic.tools.ticket_tools as tt
+
+
+# ---------------------------------------------------------------------------
+# Test
+# ---------------------------------------------------------------------------
+
+def test_finalize_ticket(db_session):
+    """
+    Seed the shared test database with one ticket and confirm finalize_ticket appends
+    the note and reply and updates the status in a single call.
+    """
+    ticket_id = str(uuid.uuid4())
+
+    account_id = str(uuid.uuid4())
+    user_id    = str(uuid.uuid4())
+
+    db_session.add_all([
+        udahub.Account(account_id=account_id, account_name="Test Account"),
+        udahub.User(user_id=user_id, account_id=account_id,
+                    external_user_id="ext-001", user_name="alice"),
+        udahub.Ticket(ticket_id=ticket_id, account_id=account_id,
+                      user_id=user_id, channel="chat"),
+        udahub.TicketMetadata(ticket_id=ticket_id, status="open"),
+    ])
+    db_session.flush()
+
+    # --- call the tool ---
+    result = tt.finalize_ticket(ticket_id, status="escalated",
+                                message="A human agent will follow up.", note="Refund dispute.")
+
+    # --- assertions ---
+    assert result.get("status") == "escalated"
+    assert len(result.get("message_ids", [])) == 2
+
+    info = tt.get_ticket_info(ticket_id)
+    assert info.get("status") == "escalated"
+    assert info.get("messages") == [
+        {"role": "system", "content": "Refund dispute."},
+        {"role": "agent", "content": "A human agent will follow up."},
+    ]
+
+    assert "error" in tt.finalize_ticket(str(uuid.uuid4()), status="resolved", message="x")
@@ -1,59 +1,196 @@
-import os
-import sys
-import uuid
 import pytest
-from sqlalchemy import create_engine
-
-workspace_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-if workspace_root not in sys.path:
-    sys.path.insert(0, workspace_root)
+from sqlalchemy import event, insert
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.orm import joinedload
 
 from data.models import udahub
-from utils import get_session
 import agentic.tools.ticket_tools as tt
 
 
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+# Fixed seed ids: every test's rows are rolled back, so the same ids can be reused.
+ACCOUNT_ID = "00000000-0000-0000-0000-000000000001"
+USER_ID    = "00000000-0000-0000-0000-000000000002"
+TICKET_ID  = "00000000-0000-0000-0000-000000000003"
+
+
+def _ticket_id(n: int) -> str:
+    return f"00000000-0000-0000-0001-{n:012d}"
+
+
+def _message_id(n: int) -> str:
+    return f"00000000-0000-0000-0002-{n:012d}"
+
+
+def _seed(session, model, rows):
+    """Insert plain row dicts for ``model`` in one statement, bypassing the unit of work."""
+    session.execute(insert(model), rows)
+
+
+def _seed_user(session):
+    """Add the test account and its customer "ext-001"; returns (account_id, user_id)."""
+    _seed(session, udahub.Account, [{"account_id": ACCOUNT_ID, "account_name": "Test Account"}])
+    _seed(session, udahub.User, [{"user_id": USER_ID, "account_id": ACCOUNT_ID,
+                                  "external_user_id": "ext-001", "user_name": "alice"}])
+    return ACCOUNT_ID, USER_ID
+
 # ---------------------------------------------------------------------------
 # Test
 # ---------------------------------------------------------------------------
 
-def test_get_ticket_info(monkeypatch, tmp_path):
+def test_get_ticket_info(db_session):
     """
-    Seed a temporary database with one ticket and confirm get_ticket_info
+    Seed the shared test database with one ticket and confirm get_ticket_info
     returns all fields with the expected values.
     """
-    # --- setup temp DB ---
-    engine = create_engine(f"sqlite:///{tmp_path / 'test_udahub.db'}", echo=False)
-    udahub.Base.metadata.create_all(engine)
-    monkeypatch.setattr(tt, "engine", engine)
-
-    ticket_id = str(uuid.uuid4())
-
-    with get_session(engine) as session:
-        account_id = str(uuid.uuid4())
-        user_id    = str(uuid.uuid4())
-
-        session.add_all([
-            udahub.Account(account_id=account_id, account_name="Test Account"),
-            udahub.User(user_id=user_id, account_id=account_id,
-                        external_user_id="ext-001", user_name="alice"),
-            udahub.Ticket(ticket_id=ticket_id, account_id=account_id,
-                          user_id=user_id, channel="chat"),
-            udahub.TicketMetadata(ticket_id=ticket_id, status="open",
-                                  main_issue_type="login", tags="login, access"),
-            udahub.TicketMessage(message_id=str(uuid.uuid4()), ticket_id=ticket_id,
-                                 role=udahub.RoleEnum.user,
-                                 content="I can't log in to my account."),
-        ])
+    ticket_id = TICKET_ID
+    account_id, user_id = _seed_user(db_session)
+
+    _seed(db_session, udahub.Ticket, [{"ticket_id": ticket_id, "account_id": account_id,
+                                       "user_id": user_id, "channel": "chat"}])
+    _seed(db_session, udahub.TicketMetadata, [{"ticket_id": ticket_id, "status": "open",
+                                               "main_issue_type": "login", "tags": "login, access"}])
+    _seed(db_session, udahub.TicketMessage, [{"message_id": _message_id(1), "ticket_id": ticket_id,
+                                              "role": udahub.RoleEnum.user,
+                                              "content": "I can't log in to my account."}])
 
     # --- call the tool ---
     result = tt.get_ticket_info(ticket_id)
 
     # --- assertions ---
-    assert result.get("ticket_id")  == ticket_id
-    assert result.get("channel")    == "chat"
-    assert result.get("user")       == "alice"
-    assert result.get("status")     == "open"
-    assert result.get("issue_type") == "login"
-    assert "login" in result.get("tags", "")
-    assert result.get("messages") == [{"role": "user", "content": "I can't log in to my account."}]
+    # One comparison covers every field (and catches unexpected extra keys).
+    assert result == {
+        "ticket_id": ticket_id,
+        "channel": "chat",
+        "created_at": result["created_at"],
+        "user": "alice",
+        "external_user_id": "ext-001",
+        "status": "open",
+        "issue_type": "login",
+        "tags": "login, access",
+        "messages": [{"role": "user", "content": "I can't log in to my account."}],
+    }
+
+
+def test_ticket_lookups_do_not_lazy_load(db_session, db_connection, monkeypatch):
+    """
+    get_ticket_info and get_customer_ticket_history eager-load metadata, user and
+    messages, so the SELECT count does not grow with the number of tickets.
+    """
+    monkeypatch.setattr(tt.settings, "debug_raiseload", True)
+
+    ticket_ids = [_ticket_id(n) for n in range(3)]
+    account_id, user_id = _seed_user(db_session)
+
+    _seed(db_session, udahub.Ticket, [
+        {"ticket_id": ticket_id, "account_id": account_id, "user_id": user_id, "channel": "chat"}
+        for ticket_id in ticket_ids
+    ])
+    _seed(db_session, udahub.TicketMetadata, [
+        {"ticket_id": ticket_id, "status": "resolved", "main_issue_type": "login", "tags": "login"}
+        for ticket_id in ticket_ids
+    ])
+    _seed(db_session, udahub.TicketMessage, [
+        {"message_id": _message_id(n), "ticket_id": ticket_id,
+         "role": udahub.RoleEnum.user, "content": "Help"}
+        for n, ticket_id in enumerate(ticket_ids)
+    ])
+
+    selects = []
+
+    @event.listens_for(db_connection, "before_cursor_execute")
+    def _count(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("SELECT"):
+            selects.append(statement)
+
+    assert tt.get_ticket_info(ticket_ids[0]).get("user") == "alice"
+    assert len(selects) <= 2
+
+    selects.clear()
+    history = tt.get_customer_ticket_history("ext-001")
+    assert "error" not in history
+    assert len(selects) <= 3
+
+
+def test_history_returns_latest_ai_message(db_session):
+    """The newest AI reply wins, including over earlier replies written in the same second."""
+    ticket_id = TICKET_ID
+    account_id, user_id = _seed_user(db_session)
+
+    _seed(db_session, udahub.Ticket, [{"ticket_id": ticket_id, "account_id": account_id,
+                                       "user_id": user_id, "channel": "chat"}])
+    # Rows are inserted in list order, so "second" is the newest AI reply.
+    messages = [("ai", "first"), ("user", "still broken"), ("ai", "second"), ("system", "note")]
+    _seed(db_session, udahub.TicketMessage, [
+        {"message_id": _message_id(n), "ticket_id": ticket_id,
+         "role": udahub.RoleEnum[role], "content": content}
+        for n, (role, content) in enumerate(messages)
+    ])
+
+    history = tt.get_customer_ticket_history("ext-001")
+
+    assert history["tickets"] == [{
+        "ticket_id": ticket_id,
+        "created_at": history["tickets"][0]["created_at"],
+        "channel": "chat",
+        "status": None,
+        "issue_type": None,
+        "tags": None,
+        "last_ai_message": "second",
+    }]
+
+
+def test_debug_raiseload_rejects_lazy_loads(db_session, monkeypatch):
+    """With debug_raiseload on, touching a relationship that was not eager-loaded raises."""
+    monkeypatch.setattr(tt.settings, "debug_raiseload", True)
+
+    ticket_id = TICKET_ID
+    account_id, user_id = _seed_user(db_session)
+
+    _seed(db_session, udahub.Ticket, [{"ticket_id": ticket_id, "account_id": account_id,
+                                       "user_id": user_id, "channel": "chat"}])
+
+    ticket = (
+        db_session.query(udahub.Ticket)
+        .options(*tt._loader_options(joinedload(udahub.Ticket.user)))
+        .filter_by(ticket_id=ticket_id)
+        .first()
+    )
+
+    assert ticket.user.user_name == "alice"
+    with pytest.raises(InvalidRequestError):
+        ticket.account
+
+
+def test_ticket_reads_are_cached_until_written(db_session, db_connection):
+    """A repeated read is served from the cache; a write to the ticket invalidates it."""
+    ticket_id = TICKET_ID
+    account_id, user_id = _seed_user(db_session)
+
+    _seed(db_session, udahub.Ticket, [{"ticket_id": ticket_id, "account_id": account_id,
+                                       "user_id": user_id, "channel": "chat"}])
+    _seed(db_session, udahub.TicketMetadata, [{"ticket_id": ticket_id, "status": "open"}])
+
+    selects = []
+
+    @event.listens_for(db_connection, "before_cursor_execute")
+    def _count(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("SELECT"):
+            selects.append(statement)
+
+    first = tt.get_ticket_info(ticket_id)
+    history = tt.get_customer_ticket_history("ext-001")
+    reads = len(selects)
+
+    first["status"] = "mutated by caller"
+    assert tt.get_ticket_info(ticket_id).get("status") == "open"
+    assert tt.get_customer_ticket_history("ext-001") == history
+    assert len(selects) == reads
+
+    tt.update_ticket_status(ticket_id, status="resolved")
+
+    assert tt.get_ticket_info(ticket_id).get("status") == "resolved"
+    assert tt.get_customer_ticket_history("ext-001")["tickets"][0]["status"] == "resolved"
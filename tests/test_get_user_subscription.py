@@ -1,12 +1,6 @@
 
-import os
-import sys
 import pytest
 
-workspace_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-if workspace_root not in sys.path:
-    sys.path.insert(0, workspace_root)
-
 from agentic.tools.cultpass_tools import (
     get_user_general_info,
     get_user_subscription,
@@ -17,35 +11,45 @@ from agentic.tools.cultpass_tools import (
 
 
 # ---------------------------------------------------------------------------
-# Tests
+# Fixtures
 # ---------------------------------------------------------------------------
 
-def test_subscribed_user_returns_status():
-    """Happy path: user exists and has a subscription — status string is returned."""
-
-    result = get_user_general_info("a4ab87")
+USER_ID = "a4ab87"
 
-    assert result.get("email") == "alice.kingsley@wonderland.com"
-    assert result.get("account_status") == "BLOCKED"
 
+@pytest.fixture(scope="module")
+def alice():
+    """Each user lookup for the test customer, run once and shared by the tests below."""
+    return {
+        "info": get_user_general_info(USER_ID),
+        "subscription": get_user_subscription(USER_ID),
+        "reservations": get_user_reservations(USER_ID),
+    }
 
-def test_check_subscription():
-    """Happy path: user exists and has a subscription — status string is returned."""
+# ---------------------------------------------------------------------------
+# Tests
+# ---------------------------------------------------------------------------
 
-    result = get_user_subscription("a4ab87")
+@pytest.mark.parametrize("lookup, field, expected", [
+    ("info", "email", "alice.kingsley@wonderland.com"),
+    ("info", "account_status", "BLOCKED"),
+    ("subscription", "subscription_status", "active"),
+    ("subscription", "subscription_tier", "premium"),
+])
+def test_user_lookup_fields(alice, lookup, field, expected):
+    """Happy path: user exists and has a subscription — each field has its expected value."""
 
-    assert result.get("subscription_status").lower() == "active"
-    assert result.get("subscription_tier").lower() == "premium"
+    assert alice[lookup].get(field) == expected
 
 
-def test_check_reservations():
-    """Happy path: user exists and has a subscription — status string is returned."""
+def test_check_reservations(alice):
+    """Happy path: user exists and has reservations — the list of reservations is returned."""
 
-    result = get_user_reservations("a4ab87")
+    reservations = alice["reservations"].get("reservations")
 
-    assert isinstance(result.get("reservations"), list)
-    assert len(result.get("reservations")) > 0
-    assert result.get("reservations")[0].get("experience_title") in [
+    assert isinstance(reservations, list)
+    assert len(reservations) > 0
+    assert reservations[0].get("experience_title") in [
         "Pelourinho Colonial Walk"]
 
 
@@ -60,7 +64,6 @@ def test_search_experiences_by_keyword():
     """Happy path: keyword matches experiences — list of matching experiences is returned."""
 
     result = search_experiences_by_keyword("Dance samba")
-    print(result)
 
     assert isinstance(result.get("experiences"), list)
     assert len(result.get("experiences")) > 0
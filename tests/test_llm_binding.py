@@ -0,0 +1,46 @@
+
+from agentic.agents._llm_binding import per_llm_cache, with_prompt_cache_key
+
+
+class _Model:
+    """Unhashable, like the pydantic chat models."""
+    __hash__ = None
+
+
+def test_binding_is_built_once_per_model():
+    """The same model reuses its binding; a new model or an evicted one is rebuilt."""
+    built = []
+
+    @per_llm_cache(maxsize=1)
+    def bind(llm):
+        built.append(llm)
+        return ("bound", llm)
+
+    first, second = _Model(), _Model()
+
+    assert bind(first) is bind(first)
+    assert len(built) == 1
+
+    bind(second)
+    bind(first)
+    assert built == [first, second, first]
+
+
+def test_prompt_cache_key_survives_bind_tools():
+    """The key is part of the model copy, so a later bind_tools (as in create_supervisor) keeps it."""
+    from langchain_core.messages import HumanMessage
+    from langchain_openai import ChatOpenAI
+
+    llm = ChatOpenAI(model="gpt-4o-mini", api_key="test")
+    keyed = with_prompt_cache_key(llm, "supervisor-abc")
+
+    def handoff(agent: str) -> str:
+        """Hand off to an agent."""
+        return agent
+
+    bound = keyed.bind_tools([handoff])
+    payload = keyed._get_request_payload([HumanMessage(content="hi")], **bound.kwargs)
+
+    assert payload["prompt_cache_key"] == "supervisor-abc"
+    assert llm.model_kwargs == {}
+    assert keyed.client is llm.client
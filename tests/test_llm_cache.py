@@ -0,0 +1,38 @@
+import asyncio
+
+from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.runnables import RunnableLambda
+
+from agentic.agents import _llm_cache
+
+
+class _FakeLLM:
+    model_name = "fake-model"
+
+
+def test_exact_hit_skips_the_llm():
+    """Identical message lists (ignoring message ids) are served from the cache."""
+    _llm_cache.clear_cache()
+    calls = []
+    runnable = RunnableLambda(lambda msgs: calls.append(msgs) or {"label": "login"})
+
+    first = [SystemMessage(content="sys"), HumanMessage(content="reset my password")]
+    second = [SystemMessage(content="sys"), HumanMessage(content="reset my password")]
+
+    a = asyncio.run(_llm_cache.cached_structured_ainvoke(_FakeLLM(), first, "Answer", runnable, semantic=False))
+    b = asyncio.run(_llm_cache.cached_structured_ainvoke(_FakeLLM(), second, "Answer", runnable, semantic=False))
+
+    assert a == b == {"label": "login"}
+    assert len(calls) == 1
+
+
+def test_different_messages_miss():
+    """A different customer message is a cache miss."""
+    _llm_cache.clear_cache()
+    calls = []
+    runnable = RunnableLambda(lambda msgs: calls.append(msgs) or {"label": "x"})
+
+    asyncio.run(_llm_cache.cached_structured_ainvoke(_FakeLLM(), [HumanMessage(content="a")], "Answer", runnable, semantic=False))
+    asyncio.run(_llm_cache.cached_structured_ainvoke(_FakeLLM(), [HumanMessage(content="b")], "Answer", runnable, semantic=False))
+
+    assert len(calls) == 2
@@ -0,0 +1,37 @@
+import asyncio
+
+import httpx
+
+from agentic.agents._llm_singleton import LoopLocalTransport
+
+
+class _FakePool(httpx.AsyncBaseTransport):
+    def __init__(self):
+        self.loop = None
+
+    async def handle_async_request(self, request):
+        loop = asyncio.get_running_loop()
+        # A real pool's kept-alive connections only work on the loop that opened them.
+        assert self.loop in (None, loop), "pool reused from another event loop"
+        self.loop = loop
+        return httpx.Response(200)
+
+
+def test_each_event_loop_gets_its_own_pool():
+    """Requests on one loop share a pool; a later asyncio.run gets a fresh one."""
+    pools = []
+
+    def factory():
+        pools.append(_FakePool())
+        return pools[-1]
+
+    client = httpx.AsyncClient(transport=LoopLocalTransport(factory))
+
+    async def two_requests():
+        await client.get("http://test/")
+        await client.get("http://test/")
+
+    asyncio.run(two_requests())
+    asyncio.run(two_requests())
+
+    assert len(pools) == 2
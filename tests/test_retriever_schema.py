@@ -0,0 +1,34 @@
+
+import pytest
+
+from agentic.agents import retriever
+from agentic.tools._schemas import TOOL_SCHEMAS
+
+
+def test_bound_schemas_are_precomputed():
+    """The search binding reuses the import-time schema dicts instead of rebuilding them."""
+    class _Model:
+        def bind(self, **kwargs):
+            return kwargs
+
+    tools = retriever._bind_search(_Model())["tools"]
+
+    assert tools[0] is TOOL_SCHEMAS["batch_search_knowledge_base"]
+    assert tools[1] is retriever._SUBMIT_SCHEMA
+    assert retriever._SUBMIT_SCHEMA["function"]["name"] == retriever.SUBMIT_TOOL
+
+
+def test_submission_is_validated_without_pydantic():
+    """Valid arguments are normalised; out-of-range values are rejected."""
+    args = {
+        "confidence": 1,
+        "articles_found": 1,
+        "retrieved_articles": [{"title": "t", "summary": "s", "relevance": "r", "extra": 1}],
+    }
+
+    result = retriever._validate_retrieval(args)
+
+    assert result["confidence"] == 1.0
+    assert result["retrieved_articles"] == [{"title": "t", "summary": "s", "relevance": "r"}]
+    with pytest.raises(ValueError):
+        retriever._validate_retrieval({**args, "confidence": 1.5})
@@ -1,22 +1,135 @@
 
-import os
-import sys
+import asyncio
 
-workspace_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-if workspace_root not in sys.path:
-    sys.path.insert(0, workspace_root)
-
-from agentic.tools.knowledge_tools import search_knowledge_base
+import agentic.tools.knowledge_tools as kt
+from agentic.tools.knowledge_tools import (
+    abatch_search_knowledge_base,
+    batch_search_knowledge_base,
+    search_knowledge_base,
+)
 
 
 def test_search_cancel_subscription():
     """Happy path: query matches a knowledge article — list of articles is returned."""
 
     result = search_knowledge_base("how to cancel my subscription")
-    print(result)
 
     assert isinstance(result.get("articles"), list)
     assert len(result.get("articles")) > 0
 
     titles = [article.get("title") for article in result.get("articles")]
     assert "How to Cancel or Pause a Subscription" in titles
+
+
+def test_batch_search_preserves_query_order(monkeypatch):
+    """Each batched query gets its own result, returned in the order requested."""
+
+    monkeypatch.setattr(kt, "_embed_many", lambda queries: [[0.0] for _ in queries])
+    monkeypatch.setattr(kt, "search_knowledge_base", lambda q: {"articles": [{"title": q.upper()}]})
+
+    result = batch_search_knowledge_base(["pause", "cancel", "refund"])
+
+    assert [r["query"] for r in result["results"]] == ["pause", "cancel", "refund"]
+    assert [r["articles"][0]["title"] for r in result["results"]] == ["PAUSE", "CANCEL", "REFUND"]
+
+
+def test_batch_lists_repeated_articles_once(monkeypatch):
+    """An article returned for several queries keeps its content only under the first one."""
+
+    monkeypatch.setattr(kt, "_embed_many", lambda queries: [[0.0] for _ in queries])
+    monkeypatch.setattr(kt, "search_knowledge_base", lambda q: {"articles": [{"title": "Refunds", "content": "..."}]})
+
+    result = batch_search_knowledge_base(["refund", "money back"])
+
+    assert result["results"][0]["articles"] == [{"title": "Refunds", "content": "..."}]
+    assert result["results"][1]["articles"] == [{"title": "Refunds", "duplicate_of_query": "refund"}]
+
+
+def test_query_embeddings_are_batched_and_cached(monkeypatch):
+    """A batch embeds its queries in one request, and later searches reuse the vectors."""
+
+    class _Doc:
+        page_content = '{"title": "Reserve an event"}'
+
+    class _FakeEmbeddings:
+        requests = []
+
+        def embed_documents(self, texts):
+            _FakeEmbeddings.requests.append(list(texts))
+            return [[0.1, 0.2] for _ in texts]
+
+    class _FakeStore:
+        embeddings = _FakeEmbeddings()
+
+        def similarity_search_by_vector(self, vector, k):
+            return [_Doc()]
+
+    monkeypatch.setattr(kt, "_vector_store", lambda: _FakeStore())
+    kt._query_vectors.clear()
+    kt._search_cached.cache_clear()
+
+    batch = batch_search_knowledge_base(["reserve a spot", "book an event"])
+    single = search_knowledge_base("reserve a spot")
+
+    assert batch["results"][0]["articles"] == [{"title": "Reserve an event"}]
+    assert single == {"articles": [{"title": "Reserve an event"}]}
+    assert _FakeEmbeddings.requests == [["reserve a spot", "book an event"]]
+    kt._query_vectors.clear()
+    kt._search_cached.cache_clear()
+
+
+def test_repeated_queries_are_served_from_cache(monkeypatch):
+    """Queries differing only in case or spacing run one embedding and one vector search."""
+
+    class _Doc:
+        page_content = '{"title": "Pause a subscription"}'
+
+    class _FakeEmbeddings:
+        def embed_documents(self, texts):
+            return [[0.1, 0.2] for _ in texts]
+
+    class _FakeStore:
+        embeddings = _FakeEmbeddings()
+        searches = 0
+
+        def similarity_search_by_vector(self, vector, k):
+            _FakeStore.searches += 1
+            return [_Doc()]
+
+    monkeypatch.setattr(kt, "_vector_store", lambda: _FakeStore())
+    kt._query_vectors.clear()
+    kt._search_cached.cache_clear()
+
+    first = search_knowledge_base("Pause my subscription")
+    again = search_knowledge_base("  pause   my subscription ")
+
+    assert first == again == {"articles": [{"title": "Pause a subscription"}]}
+    assert _FakeStore.searches == 1
+    assert set(kt._query_vectors) == {"pause my subscription"}
+    kt._query_vectors.clear()
+    kt._search_cached.cache_clear()
+
+
+def test_async_batch_search_matches_sync(monkeypatch):
+    """The async variant embeds with aembed_documents and returns the same shape as the sync tool."""
+
+    class _FakeEmbeddings:
+        async def aembed_documents(self, texts):
+            return [[0.1, 0.2] for _ in texts]
+
+    class _FakeStore:
+        embeddings = _FakeEmbeddings()
+
+    embedded = []
+    monkeypatch.setattr(kt, "_vector_store", lambda: _FakeStore())
+    monkeypatch.setattr(kt, "search_knowledge_base", lambda q: embedded.append(q) or {"articles": [{"title": q}]})
+    kt._query_vectors.clear()
+
+    result = asyncio.run(abatch_search_knowledge_base(["pause", "refund"]))
+
+    assert result == {"results": [
+        {"query": "pause", "articles": [{"title": "pause"}]},
+        {"query": "refund", "articles": [{"title": "refund"}]},
+    ]}
+    assert set(kt._query_vectors) == {"pause", "refund"}
+    kt._query_vectors.clear()
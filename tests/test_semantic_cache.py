@@ -0,0 +1,30 @@
+
+import numpy as np
+
+from agentic.agents._semantic_cache import SemanticCache
+
+
+def _unit(*values):
+    vector = np.asarray(values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def test_near_duplicate_hits_within_namespace():
+    """A vector above the threshold returns the stored value; other namespaces miss."""
+    cache = SemanticCache(threshold=0.9)
+    cache.put("ws-a", _unit(1.0, 0.0), {"confidence": 0.8})
+
+    assert cache.get("ws-a", _unit(1.0, 0.1)) == {"confidence": 0.8}
+    assert cache.get("ws-a", _unit(0.0, 1.0)) is None
+    assert cache.get("ws-b", _unit(1.0, 0.0)) is None
+
+
+def test_expired_and_evicted_entries_miss():
+    cache = SemanticCache(maxsize=1)
+    cache.put("ws", _unit(1.0, 0.0), "stale", ttl=0)
+    assert cache.get("ws", _unit(1.0, 0.0)) is None
+
+    cache.put("ws", _unit(1.0, 0.0), "old")
+    cache.put("ws", _unit(0.0, 1.0), "new")
+    assert cache.get("ws", _unit(1.0, 0.0)) is None
+    assert cache.get("ws", _unit(0.0, 1.0)) == "new"
@@ -0,0 +1,27 @@
+import asyncio
+import time
+
+from langchain_core.messages import AIMessage
+
+from agentic.agents._tool_executor import ParallelToolNode
+
+
+def _slow_echo(x: int) -> dict:
+    time.sleep(0.2)
+    return {"x": x}
+
+
+def test_tool_calls_run_concurrently_in_order():
+    """Three 0.2 s calls finish in roughly one call's time; results keep call order."""
+    node = ParallelToolNode([_slow_echo])
+    calls = [{"name": "_slow_echo", "args": {"x": i}, "id": str(i)} for i in range(3)]
+    calls.append({"name": "missing", "args": {}, "id": "m"})
+
+    start = time.perf_counter()
+    result = asyncio.run(node({"messages": [AIMessage(content="", tool_calls=calls)]}))
+    elapsed = time.perf_counter() - start
+
+    contents = [m.content for m in result["messages"]]
+    assert contents[:3] == ['{"x": 0}', '{"x": 1}', '{"x": 2}']
+    assert result["messages"][3].status == "error"
+    assert elapsed < 0.5
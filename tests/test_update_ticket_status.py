@@ -0,0 +1,70 @@
+from sqlalchemy import event, insert
+
+from data.models import udahub
+import agentic.tools.ticket_tools as tt
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+# Fixed seed ids: every test's rows are rolled back, so the same ids can be reused.
+ACCOUNT_ID = "00000000-0000-0000-0000-000000000001"
+USER_ID    = "00000000-0000-0000-0000-000000000002"
+TICKET_ID  = "00000000-0000-0000-0000-000000000003"
+
+
+def _seed(session, model, rows):
+    """Insert plain row dicts for ``model`` in one statement, bypassing the unit of work."""
+    session.execute(insert(model), rows)
+
+# ---------------------------------------------------------------------------
+# Test
+# ---------------------------------------------------------------------------
+
+def test_update_ticket_status(db_session, db_connection):
+    """
+    Seed the shared test database with one ticket and confirm update_ticket_status merges
+    tags in order without duplicates (keeping the stored spelling) and skips the UPDATE
+    when nothing changed.
+    """
+    ticket_id = TICKET_ID
+
+    _seed(db_session, udahub.Account, [{"account_id": ACCOUNT_ID, "account_name": "Test Account"}])
+    _seed(db_session, udahub.User, [{"user_id": USER_ID, "account_id": ACCOUNT_ID,
+                                     "external_user_id": "ext-001", "user_name": "alice"}])
+    _seed(db_session, udahub.Ticket, [{"ticket_id": ticket_id, "account_id": ACCOUNT_ID,
+                                       "user_id": USER_ID, "channel": "chat"}])
+    _seed(db_session, udahub.TicketMetadata, [{"ticket_id": ticket_id, "status": "open",
+                                               "main_issue_type": "login", "tags": "Login, access"}])
+
+    # --- call the tool ---
+    result = tt.update_ticket_status(ticket_id, status="in_progress", tags=" Access ,password,,")
+
+    # --- assertions ---
+    assert result.get("status") == "in_progress"
+    assert result.get("issue_type") == "login"
+    assert result.get("tags") == "Login, access, password"
+
+    updates = []
+
+    @event.listens_for(db_connection, "before_cursor_execute")
+    def _count(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("UPDATE"):
+            updates.append(statement)
+
+    info = tt.get_ticket_info(ticket_id)
+    selects = []
+
+    @event.listens_for(db_connection, "before_cursor_execute")
+    def _count_selects(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("SELECT"):
+            selects.append(statement)
+
+    again = tt.update_ticket_status(ticket_id, status="in_progress", issue_type="login", tags="password")
+    assert again.get("tags") == "Login, access, password"
+    assert updates == []
+
+    # The no-op left the cached ticket valid: only the metadata lookup hit the database.
+    assert tt.get_ticket_info(ticket_id) == info
+    assert len(selects) == 1
@@ -1,14 +1,17 @@
 # reset_udahub.py
+import asyncio
 import os
-from sqlalchemy import create_engine, Engine
+from functools import lru_cache
+from sqlalchemy import case, create_engine, event, func, Engine
+from sqlalchemy.pool import QueuePool
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from contextlib import contextmanager
-from langchain_core.messages import (
-    SystemMessage,
-    HumanMessage, 
-)
-from langgraph.graph.state import CompiledStateGraph
+from typing import TYPE_CHECKING
+from langchain_core.messages import HumanMessage
+
+if TYPE_CHECKING:
+    from langgraph.graph.state import CompiledStateGraph
 
 
 Base = declarative_base()
@@ -27,9 +30,53 @@ def reset_db(db_path: str, echo: bool = True):
     print(f"✅ Recreated {db_path} with fresh schema")
 
 
+@lru_cache(maxsize=None)
+def _engine_for(abs_path: str, echo: bool) -> Engine:
+    # A small QueuePool shared by the tool threads (a StaticPool would hand one
+    # connection to concurrent writers). Pre-ping and recycling replace connections
+    # that went stale while the server sat idle.
+    engine = create_engine(
+        f"sqlite:///{abs_path}",
+        echo=echo,
+        connect_args={"check_same_thread": False},
+        poolclass=QueuePool,
+        pool_size=8,
+        pool_pre_ping=True,
+        pool_recycle=1800,
+    )
+    event.listen(engine, "connect", _set_sqlite_pragmas)
+    return engine
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    # Runs once per pooled connection. WAL lets the tool threads read while a write
+    # commits, and synchronous=NORMAL drops the per-commit fsync (still durable across
+    # application crashes in WAL mode).
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")
+    cursor.execute("PRAGMA cache_size=-64000")
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+def get_engine(db_path: str, echo: bool = False) -> Engine:
+    """
+    Return the process-wide engine (and connection pool) for a SQLite file.
+
+    Every caller asking for the same file, e.g. the ticket tools and main.py's seeding,
+    shares one pool whose connections are opened in WAL mode.
+    """
+    return _engine_for(os.path.abspath(db_path), echo)
+
+
 @contextmanager
 def get_session(engine: Engine):
-    Session = sessionmaker(bind=engine)
+    # Callers build their results before the block exits, so nothing needs re-loading after
+    # the commit; keeping attributes loaded skips expiring (and refreshing) every instance.
+    Session = sessionmaker(bind=engine, expire_on_commit=False)
     session = Session()
     try:
         yield session
@@ -41,6 +88,18 @@ def get_session(engine: Engine):
         session.close()
 
 
+def sql_isoformat(column, label: str):
+    """
+    Render a stored DateTime as text exactly like ``datetime.isoformat()``.
+
+    SQLite keeps these columns as "YYYY-MM-DD HH:MM:SS.ffffff" strings, so swapping the
+    separator (and dropping an all-zero fraction, as isoformat does) yields the ISO form
+    without building a Python datetime per row. NULL stays NULL.
+    """
+    text = func.replace(column, " ", "T")
+    return case((func.substr(column, 20) == ".000000", func.substr(text, 1, 19)), else_=text).label(label)
+
+
 def model_to_dict(instance):
     """Convert a SQLAlchemy model instance to a dictionary."""
     return {
@@ -48,20 +107,23 @@ def model_to_dict(instance):
         for column in instance.__table__.columns
     }
 
-def chat_interface(agent:CompiledStateGraph, ticket_id:str):
-    is_first_iteration = False
-    messages = [SystemMessage(content = f"ThreadId: {ticket_id}")]
+def chat_interface(agent:"CompiledStateGraph", ticket_id:str):
+    """Run ``achat_interface`` to completion; use that one directly where a loop is running (Jupyter)."""
+    asyncio.run(achat_interface(agent, ticket_id))
+
+
+async def achat_interface(agent:"CompiledStateGraph", ticket_id:str):
+    # The whole session runs on one event loop, so the graph's pooled model connections
+    # stay usable from turn to turn. input() blocks, so it waits in a worker thread
+    # instead of stalling the loop.
     while True:
-        user_input = input("User: ")
+        user_input = await asyncio.to_thread(input, "User: ")
         print("User:", user_input)
         if user_input.lower() in ["quit", "exit", "q"]:
             print("Assistant: Goodbye!")
             break
-        messages = [HumanMessage(content=user_input)]
-        if is_first_iteration:
-            messages.append(HumanMessage(content=user_input))
         trigger = {
-            "messages": messages
+            "messages": [HumanMessage(content=user_input)]
         }
         config = {
             "configurable": {
@@ -69,6 +131,5 @@ def chat_interface(agent:CompiledStateGraph, ticket_id:str):
             }
         }
         
-        result = agent.invoke(input=trigger, config=config)
-        print("Assistant:", result["messages"][-1].content)
-        is_first_iteration = False
\ No newline at end of file
+        result = await agent.ainvoke(input=trigger, config=config)
+        print("Assistant:", result["messages"][-1].content)
\ No newline at end of file